@@ -0,0 +1,117 @@
+from collections import OrderedDict
+import threading
+import pygame
+
+
+
+
+# Process-wide cache of sprite surfaces. Every sprite is painted once and then
+# shared by all the instances that draw it.
+_assets = {}
+
+
+# Copies of the sprites scaled to the size of a view, keyed by (sprite, ..., target size).
+# Bounded: the least recently used copies are dropped once SCALED_CAPACITY is reached.
+SCALED_CAPACITY = 256
+_scaled = OrderedDict()
+
+
+# Rendered text surfaces, keyed by (font, text, color). Bounded like the scaled copies.
+TEXT_CAPACITY = 512
+_texts = OrderedDict()
+
+
+
+
+# Return the asset stored under key, building it with build() the first time it is requested.
+def load(key, build):
+
+    asset = _assets.get(key)
+    if asset is None:
+        asset = build()
+        _assets[key] = asset
+
+    return asset
+
+
+# Guards the LRU caches, which views composed on several threads share.
+_lru_lock = threading.Lock()
+
+
+
+
+# Return the entry of an LRU cache stored under key, building it with build() on a miss.
+def _load_lru(cache, capacity, key, build):
+
+    with _lru_lock:
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+            return entry
+
+    # Built outside the lock; two threads may build the same entry, and either one is kept
+    entry = build()
+    with _lru_lock:
+        cache[key] = entry
+        if len(cache) > capacity:
+            cache.popitem(last=False)
+
+    return entry
+
+
+# Return the scaled surface stored under key, building it with build() on a miss.
+# The key must include the target size, since every view size needs its own copy.
+def load_scaled(key, build):
+
+    return _load_lru(_scaled, SCALED_CAPACITY, key, build)
+
+
+# Return a font, created once per (name, size, bold). name=None is pygame's default font.
+def font(size, name=None, bold=False):
+
+    if name is None:
+        return load(("font", name, size, bold), lambda: pygame.font.Font(None, size))
+
+    return load(("font", name, size, bold), lambda: pygame.font.SysFont(name, size, bold=bold))
+
+
+# Return text rendered (antialiased) with font and color, rendering it only the first time.
+def render_text(font, text, color):
+
+    return _load_lru(_texts, TEXT_CAPACITY, ("text", font, text, tuple(color)), lambda: font.render(text, True, color))
+
+
+# Forget cached assets so they are rebuilt on next use: all of them, or only the ones named `name`.
+# Scaled copies of those assets are dropped too, since their keys start with the name of the
+# asset they are made from (e.g. ("bird", "flock", width, height)).
+def invalidate(name=None):
+
+    with _lru_lock:
+        if name is None:
+            _assets.clear()
+            _scaled.clear()
+            _texts.clear()
+            return
+
+        for cache in (_assets, _scaled, _texts):
+            for key in [key for key in cache if key[0] == name]:
+                del cache[key]
+
+
+# Names (first key element) of every asset, scaled copy and text currently cached.
+def names():
+
+    with _lru_lock:
+        return {key[0] for cache in (_assets, _scaled, _texts) for key in cache}
+
+
+# Number of assets currently cached.
+def size():
+
+    return len(_assets)
+
+
+# Number of scaled copies currently cached.
+def scaled_size():
+
+    return len(_scaled)
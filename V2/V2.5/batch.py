@@ -0,0 +1,165 @@
+import numpy as np
+from core import Bird, Course, Pipe, GROUND_Y, PIPE_ROWS
+
+
+
+
+# Several seeded courses advanced in lockstep, so one batch can fly all of them at once.
+# Pipes move and spawn the same way on every course (only their heights depend on the seed),
+# so the pipe positions, scoring and next pipe are shared and only the heights differ.
+class CourseSet:
+
+
+# Initialize one course per seed.
+    def __init__(self, seeds, bird_x=230):
+
+        self.courses = [Course(seed, bird_x) for seed in seeds]
+        self.bird_x = bird_x
+
+
+# Pipes of the first course; their positions are the same on every course.
+    @property
+    def pipes(self):
+
+        return self.courses[0].pipes
+
+
+    @property
+    def frame(self):
+
+        return self.courses[0].frame
+
+
+# Top edge of the given pipe on every course.
+    def heights(self, index):
+
+        return np.array([course.pipes[index].height for course in self.courses], dtype=float)
+
+
+    def next_pipe_index(self):
+
+        return self.courses[0].next_pipe_index()
+
+
+    def scoring(self):
+
+        return self.courses[0].scoring()
+
+
+# Move every course one frame forward.
+    def advance(self):
+
+        for course in self.courses:
+            course.advance()
+
+
+
+
+# Vectorized Flappy Bird simulation for a whole generation of birds flying one shared course.
+# With a CourseSet the lanes are split in equal consecutive blocks, one per course.
+class FlappyBatch:
+
+
+    MAX_ROTATION = Bird.MAX_ROTATION
+    ROT_VEL = Bird.ROT_VEL
+    JUMP_VEL = Bird.JUMP_VEL
+
+    BIRD_HEIGHT = Bird.HEIGHT
+    GROUND_Y = GROUND_Y
+
+
+#    Initialize one lane per bird, all of them alive at the starting position of the course.
+    def __init__(self, size, course, x=230, y=350):
+
+        self.size = size
+        self.course = course
+        self.x = x
+
+        # Bird state (one entry per lane)
+        self.y = np.full(size, float(y))
+        self.vel = np.zeros(size)
+        self.tick_count = np.zeros(size, dtype=np.int64)
+        self.height = np.full(size, float(y))
+        self.tilt = np.zeros(size)
+        self.alive = np.ones(size, dtype=bool)
+        self.score = np.zeros(size, dtype=np.int64)
+
+        # Course flown by each lane (None: every lane flies the same course)
+        if isinstance(course, CourseSet):
+            self.course_size = size // len(course.courses)
+            self.lane_course = np.arange(size) // self.course_size
+        else:
+            self.course_size = size
+            self.lane_course = None
+
+
+# Course flown by the first block of lanes, the one shown on screen.
+    def first_course(self):
+
+        return self.course if self.lane_course is None else self.course.courses[0]
+
+
+# Top and bottom edges of the gap of the given pipe, as seen by the given lanes.
+    def pipe_edges(self, index, lanes):
+
+        if self.lane_course is None:
+            pipe = self.course.pipes[index]
+            return pipe.height, pipe.bottom
+
+        heights = self.course.heights(index)[self.lane_course[lanes]]
+        return heights, heights + Pipe.GAP
+
+
+# Make the selected lanes jump.
+    def jump(self, lanes):
+
+        lanes = lanes & self.alive
+        self.vel[lanes] = self.JUMP_VEL
+        self.tick_count[lanes] = 0
+        self.height[lanes] = self.y[lanes]
+
+
+# Advance every live lane by one frame. Returns the lanes that died in this frame.
+    def step(self):
+
+        lanes = np.flatnonzero(self.alive)
+
+        # Move the birds (same physics as Bird.move)
+        self.tick_count[lanes] += 1
+        t = self.tick_count[lanes]
+        displacement = self.vel[lanes] * t + 1.5 * t ** 2
+        displacement = np.minimum(displacement, 16)
+        displacement = np.where(displacement < 0, displacement - 2, displacement)
+
+        y = self.y[lanes] + displacement
+        self.y[lanes] = y
+
+        tilt = self.tilt[lanes]
+        rising = (displacement < 0) | (y < self.height[lanes] + 50)
+        tilt = np.where(rising, np.maximum(tilt, self.MAX_ROTATION), np.where(tilt > -90, tilt - self.ROT_VEL, tilt))
+        self.tilt[lanes] = tilt
+
+        # Ground and ceiling collision
+        dead = (y + self.BIRD_HEIGHT >= self.GROUND_Y) | (y < 0)
+
+        # Pipe collision, checked before the pipes move
+        rows = np.round(y)
+        for index, pipe in enumerate(self.course.pipes):
+            overlap = PIPE_ROWS.get(pipe.x - self.x)
+            if overlap is None:
+                continue
+            top_row, bottom_row = overlap
+            height, bottom = self.pipe_edges(index, lanes)
+            dead |= (rows + top_row < height) | (rows + bottom_row >= bottom)
+
+        died = lanes[dead]
+        self.alive[died] = False
+
+        # Score the birds that made it through, then move the shared course
+        if self.course.scoring():
+            self.score[self.alive] += 1
+        self.course.advance()
+
+        result = np.zeros(self.size, dtype=bool)
+        result[died] = True
+        return result
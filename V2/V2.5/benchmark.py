@@ -0,0 +1,178 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from core import Bird, Pipe, BIRD_MASK_COLUMNS, PIPE_ROWS
+from game import BirdSprite, PipeSprite, FlappyBird
+import assets
+import random
+import time
+
+
+
+
+# Número de pares pájaro/tubería que se comprueban en cada prueba
+SAMPLES = 20000
+
+
+
+
+#    Colisión tal como se hacía antes: las máscaras se construyen en cada llamada
+def legacy_collide(pipe_sprite, pipe, bird, bird_sprite):
+
+    bird_mask = pygame.mask.from_surface(bird_sprite.img)
+    top_mask = pygame.mask.from_surface(pipe_sprite.PIPE_TOP)
+    bottom_mask = pygame.mask.from_surface(pipe_sprite.PIPE_BOTTOM)
+
+    top_offset = (pipe.x - bird.x, pipe.top - round(bird.y))
+    bottom_offset = (pipe.x - bird.x, pipe.bottom - round(bird.y))
+
+    return bird_mask.overlap(bottom_mask, bottom_offset) or bird_mask.overlap(top_mask, top_offset)
+
+
+#    Genera posiciones aleatorias de pájaro y tubería, como las que aparecen en una partida
+def make_samples(count, seed=0):
+
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(count):
+        bird = Bird(230, rng.uniform(0, 694))
+        pipe = Pipe(rng.randrange(-70, 700, Pipe.VEL), rng.randrange(50, 450))
+        samples.append((pipe, bird))
+
+    return samples
+
+
+#    Posiciones justo en el borde de las tuberías: para cada x alcanzable, el pájaro a una
+#    fila de tocar el borde de arriba o el de abajo, y tocándolo
+def make_edge_samples(height=250):
+
+    samples = []
+    for x in range(-70, 700, Pipe.VEL):
+        rows = PIPE_ROWS.get(x - 230)
+        if rows is None:
+            continue
+        top_row, bottom_row = rows
+        for y in (height - top_row - 1, height - top_row, height + Pipe.GAP - bottom_row - 1,
+                  height + Pipe.GAP - bottom_row):
+            samples.append((Pipe(x, height), Bird(230, y)))
+
+    return samples
+
+
+#    Mide el tiempo de una función de colisión sobre todas las muestras
+def time_collide(name, collide, samples):
+
+    start = time.perf_counter()
+    results = [bool(collide(pipe, bird)) for pipe, bird in samples]
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed * 1e6 / len(samples):8.2f} us/llamada")
+
+    return results, elapsed
+
+
+#    Primera y última fila opacas de cada columna de la máscara de una imagen
+def mask_columns(img):
+
+    mask = pygame.mask.from_surface(img)
+    width, height = mask.get_size()
+    columns = []
+    for x in range(width):
+        rows = [y for y in range(height) if mask.get_at((x, y))]
+        columns.append((min(rows), max(rows)))
+
+    return tuple(columns)
+
+
+#    Comprueba que BIRD_MASK_COLUMNS es la unión de las máscaras de todos los frames de la
+#    animación y que el primer frame la cubre entera
+def check_mask_columns(bird_sprite):
+
+    frames = [mask_columns(img) for img in bird_sprite.IMGS]
+    union = tuple((min(column[0] for column in columns), max(column[1] for column in columns))
+                  for columns in zip(*frames))
+
+    if union != BIRD_MASK_COLUMNS or frames[0] != BIRD_MASK_COLUMNS:
+        raise AssertionError("BIRD_MASK_COLUMNS no es la unión de los frames del pájaro")
+
+    for index, columns in enumerate(frames):
+        differences = [x for x, (column, table) in enumerate(zip(columns, BIRD_MASK_COLUMNS)) if column != table]
+        print(f"Frame {index}: columnas distintas de la tabla {differences or 'ninguna'}")
+
+
+#    Compara la colisión original con la analítica en los frames 1 y 2 de la animación. La
+#    tabla del núcleo es la del frame 0, que los contiene, así que solo puede haber colisiones
+#    de más (un píxel por debajo del ala), nunca de menos
+def check_other_frames(bird_sprite, pipe_sprite, samples):
+
+    analytic = [bool(pipe.collide(bird)) for pipe, bird in samples]
+    for index in range(1, len(bird_sprite.IMGS)):
+        bird_sprite.img = bird_sprite.IMGS[index]
+        legacy = [bool(legacy_collide(pipe_sprite, pipe, bird, bird_sprite)) for pipe, bird in samples]
+        missed = sum(pixel and not table for pixel, table in zip(legacy, analytic))
+        extra = sum(table and not pixel for pixel, table in zip(legacy, analytic))
+        if missed:
+            raise AssertionError(f"La colisión analítica pierde {missed} colisiones del frame {index}")
+        print(f"Frame {index}: {extra} colisiones de más de {len(samples)} (borde inferior del ala)")
+
+    bird_sprite.img = bird_sprite.IMGS[0]
+
+
+#    Compara la colisión original con la de máscaras cacheadas y la analítica del núcleo.
+#    La comparación exacta es con el frame 0, el que usan la física y el propio benchmark
+def benchmark_collisions():
+
+    bird_sprite = BirdSprite()
+    pipe_sprite = PipeSprite()
+    samples = make_samples(SAMPLES) + make_edge_samples()
+
+    check_mask_columns(bird_sprite)
+    print()
+
+    legacy, legacy_time = time_collide(
+        "Máscaras por llamada", lambda p, b: legacy_collide(pipe_sprite, p, b, bird_sprite), samples)
+    cached, cached_time = time_collide(
+        "Máscaras cacheadas", lambda p, b: pipe_sprite.collide(p, b, bird_sprite), samples)
+    analytic, analytic_time = time_collide(
+        "Analítica (core)", lambda p, b: p.collide(b), samples)
+
+    if legacy != cached or legacy != analytic:
+        raise AssertionError("Las colisiones no coinciden con la versión original")
+
+    print(f"\n{sum(legacy)} colisiones de {len(samples)}, idénticas en los tres métodos")
+    print(f"Aceleración cacheada: x{legacy_time / cached_time:.1f}")
+    print(f"Aceleración analítica: x{legacy_time / analytic_time:.1f}")
+
+    print()
+    check_other_frames(bird_sprite, pipe_sprite, samples)
+
+
+
+
+#    Dibuja un juego en todos los caminos que guardan copias escaladas del pájaro (detalle
+#    completo, bandada y detalle bajo) y comprueba que invalidate("bird") las borra todas
+def check_bird_invalidate():
+
+    game = FlappyBird()
+    surface = pygame.Surface((640, 480))
+    game.draw(surface, (0, 0, 640, 480))
+    game.draw(surface, (0, 0, 640, 480), flock=(game.bird.x, [300.0, 350.0], [0, 25]))
+    game.draw(surface, (0, 0, 160, 120))
+
+    assets.invalidate("bird")
+    if any(name.startswith("bird") for name in assets.names()):
+        raise AssertionError("invalidate('bird') deja copias del pájaro en la caché")
+    if not {"pipe", "sky"} <= assets.names():
+        raise AssertionError("invalidate('bird') borra recursos de otros sprites")
+
+    game.draw(surface, (0, 0, 160, 120))
+    print("invalidate('bird') borra los frames, las máscaras y todas sus copias escaladas")
+
+
+
+
+if __name__ == "__main__":
+    pygame.init()
+    benchmark_collisions()
+    print()
+    check_bird_invalidate()
@@ -0,0 +1,307 @@
+import secrets
+import random
+
+
+
+
+# Size of the game world and height of the ground.
+WIN_WIDTH = 600
+WIN_HEIGHT = 800
+GROUND_Y = 730
+
+
+# Column extents (top row, bottom row) of the opaque pixels of the bird sprite, over
+# all three animation frames. The first frame covers the other two: they only lack the
+# bottom pixel of columns 14, 17 and 18, where the wing moves. So Pipe.collide matches
+# pygame.mask.from_surface pixel for pixel on the first frame and can only report one
+# pixel more on the others. The physics has no animation frame, so it always uses this
+# union; benchmark.py checks it against the masks of every frame.
+BIRD_MASK_COLUMNS = (
+    (7, 20), (8, 22), (8, 24), (8, 25), (8, 26), (7, 27), (6, 28), (5, 29), (5, 29), (4, 30),
+    (3, 31), (3, 31), (2, 32), (2, 32), (2, 33), (1, 33), (1, 33), (1, 34), (1, 34), (0, 34),
+    (0, 34), (0, 34), (0, 34), (0, 34), (0, 34), (0, 34), (0, 34), (0, 34), (0, 34), (0, 34),
+    (0, 34), (1, 33), (1, 33), (1, 33), (1, 33), (2, 32), (2, 32), (2, 32), (3, 31), (3, 31),
+    (4, 30), (5, 29), (5, 29), (6, 28), (7, 27), (8, 26), (9, 25), (10, 24), (12, 22), (14, 20),
+)
+
+
+# Top and bottom bird rows covered by a pipe that starts `offset` pixels from the
+# bird's left edge, for every offset where they overlap. Built once at import.
+def _build_pipe_rows(pipe_width):
+
+    rows = {}
+    for offset in range(1 - pipe_width, len(BIRD_MASK_COLUMNS)):
+        columns = BIRD_MASK_COLUMNS[max(0, offset):offset + pipe_width]
+        rows[offset] = (min(top for top, _ in columns), max(bottom for _, bottom in columns))
+
+    return rows
+
+
+
+
+#    Bird physics, without any drawing.
+class Bird:
+
+
+    MAX_ROTATION = 25
+    ROT_VEL = 20
+    JUMP_VEL = -10.5
+    WIDTH = 50
+    HEIGHT = 35
+
+
+#        Initialize the bird.
+    def __init__(self, x=200, y=350):
+
+        self.x = x
+        self.y = y
+        self.tilt = 0
+        self.tick_count = 0
+        self.vel = 0
+        self.height = self.y
+
+
+# Make the bird jump.
+    def jump(self):
+
+        self.vel = self.JUMP_VEL
+        self.tick_count = 0
+        self.height = self.y
+
+
+# Move the bird based on physics.
+    def move(self):
+
+        self.tick_count += 1
+
+        # Calculate displacement
+        displacement = self.vel * self.tick_count + 1.5 * self.tick_count ** 2
+
+        # Terminal velocity
+        if displacement >= 16:
+            displacement = 16
+
+        if displacement < 0:
+            displacement -= 2
+
+        # Update position
+        self.y = self.y + displacement
+
+        # Tilt bird
+        if displacement < 0 or self.y < self.height + 50:
+            if self.tilt < self.MAX_ROTATION:
+                self.tilt = self.MAX_ROTATION
+        else:
+            if self.tilt > -90:
+                self.tilt -= self.ROT_VEL
+
+
+# Every tilt Bird.move can produce: starting level, a jump sets MAX_ROTATION and the
+# fall lowers it ROT_VEL at a time while it is above -90. Built once at import.
+def _build_bird_tilts():
+
+    tilts = set()
+    pending = [0]
+    while pending:
+        tilt = pending.pop()
+        if tilt in tilts:
+            continue
+        tilts.add(tilt)
+        pending.append(max(tilt, Bird.MAX_ROTATION))
+        if tilt > -90:
+            pending.append(tilt - Bird.ROT_VEL)
+
+    return tuple(sorted(tilts))
+
+
+BIRD_TILTS = _build_bird_tilts()
+
+
+
+
+# Pipe position and collision, without any drawing.
+class Pipe:
+
+
+    GAP = 200
+    VEL = 5
+    WIDTH = 70
+    HEIGHT = 500
+
+
+# Initialize the pipe. If no height is given it is drawn from rng (a random.Random).
+    def __init__(self, x, height=None, rng=None):
+
+        self.x = x
+        self.height = 0
+        self.gap = self.GAP
+        self.passed = False
+
+        # Where the top and bottom of the pipe is
+        self.top = 0
+        self.bottom = 0
+
+        # Set the pipe position
+        self.set_height(height, rng)
+
+
+# Set the height of the pipe from the top of the screen, drawing it from rng if none is given.
+# Without rng a private stream is used, so the global random module is never touched.
+    def set_height(self, height=None, rng=None):
+
+        if height is None:
+            height = (rng or _pipe_random).randrange(50, 450)
+        self.height = height
+        self.top = self.height - self.HEIGHT
+        self.bottom = self.height + self.GAP
+
+
+# Move the pipe based on velocity.
+    def move(self):
+
+        self.x -= self.VEL
+
+
+# Check if the bird collides with the pipe.
+    def collide(self, bird):
+
+        # Rows of the bird that overlap the pipe horizontally, None if it is nowhere near
+        rows = PIPE_ROWS.get(self.x - bird.x)
+        if rows is None:
+            return False
+
+        # Same rounding as the pixel mask offsets
+        row = round(bird.y)
+        top, bottom = rows
+        return row + top < self.height or row + bottom >= self.bottom
+
+
+PIPE_ROWS = _build_pipe_rows(Pipe.WIDTH)
+
+
+# Fallback stream for pipes created without a course.
+_pipe_random = random.Random()
+
+
+
+
+# Sequence of pipes shared by every game of a generation.
+class Course:
+
+
+    FIRST_PIPE_X = 700
+    SPAWN_X = 600
+
+
+# Initialize the course. The same seed always produces the same pipes. Without a seed a
+# fresh one is drawn and kept in self.seed, so any course can be replayed.
+    def __init__(self, seed=None, bird_x=230):
+
+        self.seed = secrets.randbits(32) if seed is None else seed
+        self.bird_x = bird_x
+        self.random = random.Random(self.seed)
+        self.frame = 0
+        self.pipes = [self._new_pipe(self.FIRST_PIPE_X)]
+
+
+# Create the next pipe of the course.
+    def _new_pipe(self, x):
+
+        return Pipe(x, rng=self.random)
+
+
+# Index of the pipe the birds are currently heading to.
+    def next_pipe_index(self):
+
+        if len(self.pipes) > 1 and self.bird_x > self.pipes[0].x + Pipe.WIDTH:
+            return 1
+        return 0
+
+
+# Check if the birds pass a pipe in the current frame.
+    def scoring(self):
+
+        return any(not pipe.passed and pipe.x < self.bird_x for pipe in self.pipes)
+
+
+# Move the course one frame forward. Must be called once per frame, after every game has updated.
+    def advance(self):
+
+        add_pipe = False
+        pipes_to_remove = []
+        for pipe in self.pipes:
+            # Check if pipe is off the screen
+            if pipe.x + Pipe.WIDTH < 0:
+                pipes_to_remove.append(pipe)
+
+            # Check if bird passed the pipe
+            if not pipe.passed and pipe.x < self.bird_x:
+                pipe.passed = True
+                add_pipe = True
+
+            # Move the pipe
+            pipe.move()
+
+        # Add a new pipe if the birds passed one
+        if add_pipe:
+            self.pipes.append(self._new_pipe(self.SPAWN_X))
+
+        # Remove pipes that are off the screen
+        for pipe in pipes_to_remove:
+            self.pipes.remove(pipe)
+
+        self.frame += 1
+
+
+
+
+# Headless Flappy Bird game: one bird flying a course, no pygame involved.
+class FlappyGame:
+
+
+# Initialize the game. Games that share a course leave advancing it to their owner.
+    def __init__(self, course=None):
+
+        self.bird = Bird(230, 350)
+        self.owns_course = course is None
+        self.course = Course(bird_x=self.bird.x) if course is None else course
+        self.score = 0
+        self.active = True
+
+
+# Pipes of the course this game is played on.
+    @property
+    def pipes(self):
+
+        return self.course.pipes
+
+
+# Update the game state.
+    def update(self):
+
+        if not self.active:
+            return "dead"
+
+        # Move the bird
+        self.bird.move()
+
+        # Check for ground collision
+        if self.bird.y + Bird.HEIGHT >= GROUND_Y or self.bird.y < 0:
+            self.active = False
+            return "dead"
+
+        # Check for collision
+        for pipe in self.pipes:
+            if pipe.collide(self.bird):
+                self.active = False
+                return "dead"
+
+        # Add score if bird passed a pipe
+        if self.course.scoring():
+            self.score += 1
+
+        # Move the pipes
+        if self.owns_course:
+            self.course.advance()
+
+        return "alive"
@@ -0,0 +1,202 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import numpy as np
+from batch import FlappyBatch, CourseSet
+from core import Course
+from game import FlappyBird
+from network import BatchNetwork
+import random
+import neat
+
+
+
+
+# Genomas, mutaciones de cada uno y entradas aleatorias de la comprobación de redes
+GENOMES = 300
+MUTATIONS = 40
+INPUT_ROWS = 50
+
+# Diferencia máxima admitida entre BatchNetwork y FeedForwardNetwork, relativa a la salida
+# cuando esta pasa de 1
+TOLERANCE = 1e-12
+
+# Probabilidad de cambiar la activación o la agregación de un nodo al mutar, en la prueba
+# con todas las funciones de NEAT mezcladas
+FUNCTION_MUTATE_RATE = 0.3
+
+# Pájaros, cursos y frames de la comprobación de la física
+LANES = 48
+COURSES = 3
+FRAMES = 3000
+JUMP_PROBABILITY = 0.3
+
+
+
+
+#    Configuración NEAT del entrenamiento, junto a este fichero
+def load_config():
+
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.txt")
+    return neat.config.Config(
+        neat.DefaultGenome,
+        neat.DefaultReproduction,
+        neat.DefaultSpeciesSet,
+        neat.DefaultStagnation,
+        config_path
+    )
+
+
+#    Genomas nuevos mutados muchas veces, con nodos ocultos y conexiones como los de una
+#    ejecución avanzada
+def make_genomes(config, count, mutations, seed=0):
+
+    random.seed(seed)
+    genomes = []
+    for key in range(count):
+        genome = config.genome_type(key)
+        genome.configure_new(config.genome_config)
+        for _ in range(random.randrange(mutations + 1)):
+            genome.mutate(config.genome_config)
+        genomes.append(genome)
+
+    return genomes
+
+
+#    Configuración en la que cada nodo puede usar cualquier activación y agregación de NEAT
+def mixed_functions_config():
+
+    config = load_config()
+    genome_config = config.genome_config
+    genome_config.activation_options = sorted(genome_config.activation_defs.functions)
+    genome_config.activation_mutate_rate = FUNCTION_MUTATE_RATE
+    genome_config.aggregation_options = sorted(genome_config.aggregation_function_defs.functions)
+    genome_config.aggregation_mutate_rate = FUNCTION_MUTATE_RATE
+    return config
+
+
+#    Mayor diferencia entre BatchNetwork y FeedForwardNetwork.activate para los carriles dados
+def network_difference(batch_net, nets, lanes, inputs):
+
+    outputs = batch_net.activate(inputs, lanes)
+    expected = np.array([nets[lane].activate(row) for lane, row in zip(lanes, inputs)])
+    scale = np.maximum(np.abs(expected), 1.0)
+    return float(np.max(np.where(outputs == expected, 0.0, np.abs(outputs - expected) / scale)))
+
+
+#    Compara la red por lotes con la de neat-python en todos los carriles, en un subconjunto
+#    y en una lista con carriles repetidos
+def check_networks(config=None, input_range=800):
+
+    config = config or load_config()
+    genomes = make_genomes(config, GENOMES, MUTATIONS)
+    batch_net = BatchNetwork(genomes, config)
+    nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome in genomes]
+
+    rng = np.random.default_rng(0)
+    inputs_count = len(config.genome_config.input_keys)
+    hidden = sum(len(genome.nodes) - len(config.genome_config.output_keys) for genome in genomes)
+    print(f"{len(genomes)} genomas, {hidden} nodos ocultos, {batch_net.depth_count} niveles")
+
+    cases = (
+        ("Todos los carriles", lambda: np.arange(len(genomes))),
+        ("Subconjunto", lambda: np.sort(rng.choice(len(genomes), len(genomes) // 3, replace=False))),
+        ("Carriles repetidos", lambda: rng.choice(len(genomes), len(genomes), replace=True)),
+    )
+    worst = 0.0
+    for name, make_lanes in cases:
+        difference = 0.0
+        for _ in range(INPUT_ROWS):
+            lanes = make_lanes()
+            inputs = rng.uniform(-input_range, input_range, (len(lanes), inputs_count))
+            difference = max(difference, network_difference(batch_net, nets, lanes, inputs))
+        print(f"{name:<28} diferencia máxima {difference:.3g}")
+        worst = max(worst, difference)
+
+    if worst > TOLERANCE:
+        raise AssertionError(f"BatchNetwork difiere de FeedForwardNetwork en {worst:.3g}")
+
+
+#    Con una activación definida por el usuario BatchNetwork evalúa cada genoma con
+#    FeedForwardNetwork; el resultado tiene que ser el mismo
+def check_custom_activation():
+
+    config = load_config()
+    config.genome_config.add_activation("half", lambda z: z / 2)
+    config.genome_config.activation_default = "half"
+    config.genome_config.activation_options = ["half"]
+    genomes = make_genomes(config, 20, 5)
+    batch_net = BatchNetwork(genomes, config)
+    nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome in genomes]
+
+    inputs = np.random.default_rng(0).uniform(-10, 10, (len(genomes), len(config.genome_config.input_keys)))
+    difference = network_difference(batch_net, nets, np.arange(len(genomes)), inputs)
+    if batch_net.networks is None or difference > TOLERANCE:
+        raise AssertionError("BatchNetwork no recurre a FeedForwardNetwork con una activación propia")
+    print(f"Activación propia (una red por genoma) diferencia máxima {difference:.3g}")
+
+
+#    Juega el lote y una partida FlappyBird por carril con los mismos saltos aleatorios y
+#    compara posición, inclinación, vida y puntuación en cada frame. Con varias semillas los
+#    carriles se reparten entre los cursos de un CourseSet, como en --courses
+def check_physics(seeds, lanes=LANES, frames=FRAMES):
+
+    course_size = lanes // len(seeds)
+    if len(seeds) == 1:
+        batch = FlappyBatch(lanes, Course(seeds[0]))
+    else:
+        batch = FlappyBatch(lanes, CourseSet(seeds))
+
+    # Las partidas de cada curso comparten un Course igual al del lote y lo avanzan tras
+    # actualizarse todas, como hacía eval_genomes
+    courses = [Course(seed) for seed in seeds]
+    games = [FlappyBird(courses[lane // course_size]) for lane in range(lanes)]
+
+    # Cada pájaro salta a veces al quedar por debajo de su propia altura dentro del hueco,
+    # así que muchos pasan varias tuberías y mueren en sitios distintos
+    rng = np.random.default_rng(seeds[0])
+    aim = rng.uniform(40, 160, lanes)
+    for frame in range(frames):
+        index = courses[0].next_pipe_index()
+        targets = np.array([game.pipes[index].height for game in games]) + aim
+        below = np.array([game.bird.y for game in games]) > targets
+        jumps = below & (rng.random(lanes) < JUMP_PROBABILITY)
+        batch.jump(jumps)
+        for game, jump in zip(games, jumps):
+            if jump and game.active:
+                game.bird.jump()
+
+        batch.step()
+        for game in games:
+            game.update()
+        for course in courses:
+            course.advance()
+
+        alive = np.array([game.active for game in games])
+        y = np.array([game.bird.y for game in games])
+        tilt = np.array([game.bird.tilt for game in games])
+        score = np.array([game.score for game in games])
+        if (not np.array_equal(alive, batch.alive) or not np.array_equal(score, batch.score)
+                or not np.array_equal(y[alive], batch.y[alive]) or not np.array_equal(tilt[alive], batch.tilt[alive])):
+            raise AssertionError(f"FlappyBatch difiere de FlappyBird.update en el frame {frame}")
+
+        if not alive.any():
+            break
+
+    print(f"{len(seeds)} curso(s), {lanes} pájaros: idénticos durante {frame + 1} frames, "
+          f"puntuación máxima {batch.score.max()}")
+
+
+
+
+if __name__ == "__main__":
+    pygame.init()
+    check_networks()
+    print()
+    print("Todas las activaciones y agregaciones de NEAT:")
+    check_networks(mixed_functions_config(), input_range=2)
+    check_custom_activation()
+    print()
+    check_physics([7])
+    check_physics(list(range(11, 11 + COURSES)))
@@ -0,0 +1,437 @@
+from batch import FlappyBatch, CourseSet
+from network import BatchNetwork, compile_cache, genome_fingerprint
+from core import Course
+import numpy as np
+import multiprocessing
+import pickle
+import neat
+import os
+
+
+
+
+# Altura usada para normalizar las entradas de la red (MAIN_GAME_HEIGHT del dashboard)
+INPUT_HEIGHT = 480
+
+
+# Velocidad máxima usada para normalizar la velocidad del pájaro
+INPUT_VELOCITY = 30
+
+
+# Frames como máximo de una generación por defecto (200 s a tiempo real)
+MAX_FRAMES = 20000
+
+
+# Versión de la función de fitness. Hay que subirla al cambiar las entradas de la red, el
+# cálculo del fitness o la física, para que no se reutilicen resultados guardados antiguos
+FITNESS_VERSION = 1
+
+
+
+
+#    Calcula las entradas de la red para los carriles indicados
+def observe(batch, lanes):
+
+    height, bottom = batch.pipe_edges(batch.course.next_pipe_index(), lanes)
+    bird_y = batch.y[lanes]
+
+    return np.column_stack((
+        np.clip(bird_y / INPUT_HEIGHT, 0, 1),
+        np.clip(np.abs(bird_y - height) / INPUT_HEIGHT, 0, 1),
+        np.clip(np.abs(bird_y - bottom) / INPUT_HEIGHT, 0, 1),
+        np.clip(batch.vel[lanes] / INPUT_VELOCITY, -1, 1)
+    ))
+
+
+#    Actualiza el fitness de los carriles que jugaron este frame
+def update_fitness(fitness, batch, lanes):
+
+    fitness[lanes] += 0.5  # Recompensa por seguir vivo
+    scores = batch.score[lanes]
+    score_based = scores > (fitness[lanes] - 0.1 * batch.tick_count[lanes]) / 5  # Ajustar para que el score sea el factor principal
+    fitness[lanes[score_based]] = scores[score_based] * 5
+
+
+#    Avanza un frame: las redes deciden los saltos, se mueve el lote y se actualiza el fitness.
+#    Con varios cursos el carril l lo juega el genoma l % network.size
+def step(batch, network, fitness):
+
+    lanes = np.flatnonzero(batch.alive)
+
+    output = network.activate(observe(batch, lanes), lanes % network.size)
+    jumps = np.zeros(batch.size, dtype=bool)
+    jumps[lanes] = output[:, 0] > 0.5
+    batch.jump(jumps)
+
+    batch.step()
+    update_fitness(fitness, batch, lanes)
+
+
+#    Juega una generación completa sin pantalla, en los cursos que indica sampling. Devuelve
+#    el fitness de cada genoma y qué genomas se retiraron por agotar el presupuesto
+def play(genomes, config, course_seed, budget=None, sampling=None):
+
+    sampling = sampling or CourseSampling()
+    batch = FlappyBatch(len(genomes) * sampling.courses, sampling.course(course_seed))
+    network = BatchNetwork(genomes, config)
+    fitness = np.zeros(batch.size)
+    capped = np.zeros(batch.size, dtype=bool)
+    budget = budget or EpisodeBudget()
+
+    while batch.alive.any():
+        step(batch, network, fitness)
+        capped |= budget.enforce(batch)
+
+    return sampling.aggregate_fitness(fitness), sampling.aggregate_capped(capped)
+
+
+
+
+# VARIOS CURSOS POR GENOMA
+
+
+
+
+# Cursos en los que se puntúa cada genoma y cómo se combinan sus resultados. Con courses > 1
+# cada genoma juega todos los cursos a la vez, como carriles extra del mismo lote (un bloque
+# de carriles por curso), y su fitness es la media, el mínimo o un percentil de los que
+# obtuvo en cada uno: aggregate es "mean", "min" o un número de 0 a 100.
+class CourseSampling:
+
+
+    AGGREGATES = ("mean", "min")
+
+
+#    Guarda el número de cursos y la forma de combinarlos
+    def __init__(self, courses=1, aggregate="mean"):
+
+        if aggregate not in self.AGGREGATES:
+            aggregate = float(aggregate)
+            if not 0 <= aggregate <= 100:
+                raise ValueError(f"Percentil fuera de rango: {aggregate}")
+
+        self.courses = max(courses, 1)
+        self.aggregate = aggregate
+
+
+#    Semillas de los cursos: el primero es el de course_seed y el resto salen de ella
+    def seeds(self, course_seed):
+
+        extra = np.random.SeedSequence(course_seed).generate_state(self.courses - 1)
+        return [course_seed] + [int(seed) for seed in extra]
+
+
+#    Curso o conjunto de cursos que juega el lote
+    def course(self, course_seed):
+
+        if self.courses == 1:
+            return Course(course_seed)
+        return CourseSet(self.seeds(course_seed))
+
+
+#    Combina el fitness de los carriles de cada genoma en uno solo
+    def aggregate_fitness(self, fitness):
+
+        per_course = fitness.reshape(self.courses, -1)
+        if self.aggregate == "mean":
+            return per_course.mean(axis=0)
+        if self.aggregate == "min":
+            return per_course.min(axis=0)
+        return np.percentile(per_course, self.aggregate, axis=0)
+
+
+#    Un genoma se retiró por el presupuesto si se retiró en alguno de sus cursos
+    def aggregate_capped(self, capped):
+
+        return capped.reshape(self.courses, -1).any(axis=0)
+
+
+
+
+# LÍMITE DE CADA GENERACIÓN
+
+
+
+
+# Presupuesto de una generación: con max_frames el episodio termina en ese frame del curso
+# y con max_score cada pájaro se retira al llegar a esa puntuación. Los pájaros retirados
+# conservan el fitness acumulado hasta ese frame, que solo depende del curso y del genoma,
+# así que el resultado es el mismo jugando en uno o en varios procesos. None = sin límite.
+class EpisodeBudget:
+
+
+#    Guarda los límites
+    def __init__(self, max_frames=None, max_score=None):
+
+        self.max_frames = max_frames
+        self.max_score = max_score
+
+
+#    Retira los carriles vivos que agotaron el presupuesto y los devuelve como máscara
+    def enforce(self, batch):
+
+        capped = np.zeros(batch.size, dtype=bool)
+        if self.max_frames is not None and batch.course.frame >= self.max_frames:
+            capped[:] = batch.alive
+        elif self.max_score is not None:
+            capped = batch.alive & (batch.score >= self.max_score)
+
+        batch.alive[capped] = False
+        return capped
+
+
+
+
+# SEMILLAS
+
+
+
+
+# Semillas de una ejecución. De la semilla raíz salen, con numpy.random.SeedSequence, tres
+# flujos independientes: el de las semillas de los cursos de cada generación, el de NEAT
+# (mutación y reproducción, que usan el módulo random global) y el de los detalles
+# cosméticos del dashboard. Con la misma semilla raíz el entrenamiento se repite idéntico.
+class RunSeeds:
+
+
+#    Crea los flujos; sin semilla se elige una al azar, que queda en self.seed
+    def __init__(self, seed=None):
+
+        sequence = np.random.SeedSequence(seed)
+        self.seed = sequence.entropy
+        courses, neat_sequence, cosmetic = sequence.spawn(3)
+
+        self.courses = np.random.default_rng(courses)
+        self.neat_seed = int(neat_sequence.generate_state(1)[0])
+        self.cosmetic_seed = int(cosmetic.generate_state(1)[0])
+
+
+#    Semilla del curso de la siguiente generación
+    def course_seed(self):
+
+        return int(self.courses.integers(2 ** 32))
+
+
+
+
+# CACHÉ DE FITNESS
+
+
+
+
+# Fitness ya calculados, por (huella del genoma, semilla del curso, versión del fitness,
+# presupuesto). Con el mismo curso un genoma siempre obtiene el mismo resultado, así que
+# las élites que pasan sin cambios a la siguiente generación no se vuelven a simular.
+# Los genomas idénticos de una misma población se simulan una sola vez.
+# Con path los resultados se cargan de disco al crearla y se guardan con `save`.
+class FitnessCache:
+
+
+#    Carga los resultados guardados en path, si existen
+    def __init__(self, path=None):
+
+        self.path = path
+        self.results = {}
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                self.results = pickle.load(f)
+
+        # Genomas de la última evaluación: reutilizados de la caché, repetidos y simulados
+        self.reused = 0
+        self.duplicates = 0
+        self.played = 0
+
+
+#    Clave de un genoma jugado en el curso, con el presupuesto y en los cursos indicados.
+#    Empieza por genome_fingerprint, que BatchNetwork puede reutilizar (ver fingerprints)
+    @staticmethod
+    def key(genome, course_seed, budget=None, sampling=None):
+
+        budget = budget or EpisodeBudget()
+        sampling = sampling or CourseSampling()
+        return (genome_fingerprint(genome), course_seed, FITNESS_VERSION, budget.max_frames, budget.max_score,
+                sampling.courses, sampling.aggregate)
+
+
+#    Claves de los genomas, y claves y genomas que hay que simular (uno por clave sin resultado)
+    def plan(self, genomes, course_seed, budget=None, sampling=None):
+
+        keys = [self.key(genome, course_seed, budget, sampling) for genome in genomes]
+        play_keys = {}
+        for genome, key in zip(genomes, keys):
+            if key not in self.results and key not in play_keys:
+                play_keys[key] = genome
+
+        self.reused = sum(key in self.results for key in keys)
+        self.played = len(play_keys)
+        self.duplicates = len(keys) - self.reused - self.played
+        return keys, list(play_keys), list(play_keys.values())
+
+
+#    Huellas de los genomas de las claves dadas, para compilar sus redes sin volver a calcularlas
+    @staticmethod
+    def fingerprints(keys):
+
+        return [key[0] for key in keys]
+
+
+#    Guarda los resultados de los genomas simulados y devuelve el fitness y los carriles
+#    retirados de todos, en el orden de keys
+    def complete(self, keys, play_keys, fitness, capped):
+
+        for key, genome_fitness, genome_capped in zip(play_keys, fitness, capped):
+            self.results[key] = (float(genome_fitness), bool(genome_capped))
+
+        fitness = np.array([self.results[key][0] for key in keys], dtype=float)
+        capped = np.array([self.results[key][1] for key in keys], dtype=bool)
+        return fitness, capped
+
+
+#    Guarda los resultados en disco
+    def save(self):
+
+        if self.path is not None:
+            with open(self.path, "wb") as f:
+                pickle.dump(self.results, f)
+
+
+#    Texto corto con el resultado de la última evaluación
+    def label(self):
+
+        return f"{self.reused} reutilizados, {self.duplicates} repetidos, {self.played} simulados"
+
+
+
+
+#    Evalúa los genomas con evaluate(genomes) -> (fitness, retirados), simulando solo los
+#    que no están en la caché y una sola vez cada genoma repetido. Devuelve el fitness y los
+#    retirados de todos, en el orden de genomes, y aparte los retirados de los simulados
+#    ahora, que son los que cuentan para el presupuesto de esta generación (BudgetReporter)
+def evaluate_cached(cache, genomes, course_seed, budget, evaluate, sampling=None):
+
+    keys, play_keys, play_genomes = cache.plan(genomes, course_seed, budget, sampling)
+    if play_genomes:
+        fitness, capped = evaluate(play_genomes)
+    else:
+        fitness, capped = np.zeros(0), np.zeros(0, dtype=bool)
+
+    return (*cache.complete(keys, play_keys, fitness, capped), capped)
+
+
+
+
+# Reporter de NEAT que cuenta cuántas generaciones terminaron por el presupuesto
+# en lugar de porque murieran todos los pájaros
+class BudgetReporter(neat.reporting.BaseReporter):
+
+
+#    Inicializa los contadores
+    def __init__(self):
+
+        self.generations = 0
+        self.capped_generations = 0
+        self.capped_birds = 0
+
+
+#    Registra los carriles retirados en la generación que acaba de evaluarse. capped son
+#    solo los de los genomas simulados en ella, no los que vienen de la caché de fitness
+    def record(self, capped):
+
+        self.capped_birds = int(np.count_nonzero(capped))
+        self.generations += 1
+        self.capped_generations += self.capped_birds > 0
+
+
+#    Muestra el resultado al terminar la evaluación de cada generación
+    def post_evaluate(self, config, population, species, best_genome):
+
+        status = f"alcanzado ({self.capped_birds} pájaros retirados)" if self.capped_birds else "no alcanzado"
+        print(f"Presupuesto de la generación: {status}; "
+              f"alcanzado en {self.capped_generations} de {self.generations} generaciones")
+
+
+
+
+# EVALUACIÓN EN VARIOS PROCESOS
+
+
+
+
+# Configuración NEAT de cada proceso, recibida una sola vez al arrancar
+_worker_config = None
+
+
+#    Inicializa un proceso del pool
+def _init_worker(config):
+
+    global _worker_config
+    _worker_config = config
+
+
+#    Juega la parte de la generación asignada a un proceso. Devuelve también los aciertos
+#    y fallos de la caché de redes compiladas de este proceso durante la jugada
+def _play_chunk(args):
+
+    genomes, course_seed, budget, sampling = args
+    hits, misses = compile_cache.hits, compile_cache.misses
+    fitness, capped = play(genomes, _worker_config, course_seed, budget, sampling)
+    return fitness, capped, compile_cache.hits - hits, compile_cache.misses - misses
+
+
+
+
+# Reparte los genomas de cada generación entre varios procesos. Todos juegan el mismo
+# curso, así que el resultado es el mismo que jugando la generación en un solo lote.
+class ParallelEvaluator:
+
+
+#    Arranca el pool de procesos
+    def __init__(self, workers, config):
+
+        self.workers = workers
+        self.pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(config,))
+
+
+#    Envía los genomas a los procesos; devuelve un resultado pendiente para `gather`
+    def submit(self, genomes, course_seed, budget=None, sampling=None):
+
+        chunks = [chunk for chunk in np.array_split(np.arange(len(genomes)), self.workers) if len(chunk)]
+        jobs = [([genomes[i] for i in chunk], course_seed, budget, sampling) for chunk in chunks]
+
+        return self.pool.map_async(_play_chunk, jobs)
+
+
+#    Espera a un resultado de `submit` y devuelve, en orden, el fitness de cada genoma
+#    y los carriles retirados por el presupuesto. Los aciertos de las cachés de redes de
+#    los procesos se suman a la de este proceso, para el reporter
+    @staticmethod
+    def gather(pending):
+
+        results = pending.get()
+        if not results:
+            return np.zeros(0), np.zeros(0, dtype=bool)
+
+        fitness, capped, hits, misses = zip(*results)
+        compile_cache.count(sum(hits), sum(misses))
+        return np.concatenate(fitness), np.concatenate(capped)
+
+
+#    Evalúa los genomas y espera al resultado. Con cache solo se simulan los que no tienen
+#    un resultado guardado para este curso y se devuelven también los retirados de los
+#    simulados (ver evaluate_cached)
+    def evaluate(self, genomes, course_seed, budget=None, cache=None, sampling=None):
+
+        if cache is not None:
+            return evaluate_cached(cache, genomes, course_seed, budget,
+                                   lambda play_genomes: self.evaluate(play_genomes, course_seed, budget,
+                                                                      sampling=sampling),
+                                   sampling)
+
+        return self.gather(self.submit(genomes, course_seed, budget, sampling))
+
+
+#    Cierra el pool de procesos
+    def close(self):
+
+        self.pool.close()
+        self.pool.join()
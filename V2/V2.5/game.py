@@ -1,39 +1,67 @@
 import pygame
+import numpy as np
 import random
 import os
+from itertools import repeat
+import assets
+from core import FlappyGame, Bird, Pipe, BIRD_TILTS, WIN_WIDTH, WIN_HEIGHT, GROUND_Y
 
 
 
 
-#    Bird class for the Flappy Bird game.
-class Bird:
+# Random stream for purely cosmetic details (ground texture, clouds). It is separate from
+# the course and training streams, so drawing more or fewer frames never changes a run.
+cosmetic_random = random.Random()
+
+
+# Seed the cosmetic stream, to make the look of a run reproducible as well.
+def seed_cosmetics(seed):
+
+    cosmetic_random.seed(seed)
+
+
+
+
+#    Sprite that draws a bird of the game core.
+class BirdSprite:
 
 
-    MAX_ROTATION = 25
-    ROT_VEL = 20
     ANIMATION_TIME = 5
 
+    # Opacity of each bird when the whole flock is drawn over one course, and the
+    # color used as transparent in its sprites (not present in the bird)
+    FLOCK_ALPHA = 110
+    FLOCK_COLORKEY = (255, 0, 255)
 
-#        Initialize the bird.
-    def __init__(self, x=200, y=350):
 
-        self.x = x
-        self.y = y
-        self.tilt = 0
-        self.tick_count = 0
-        self.vel = 0
-        self.height = self.y
+#        Initialize the bird sprite.
+    def __init__(self):
+
         self.img_count = 0
 
-        # Improved bird images with better visuals
-        self.IMGS = [
+        # Improved bird images with better visuals, shared by every bird
+        self.IMGS = assets.load(("bird",), self._create_frames)
+
+        # Initialize the image to avoid NoneType error
+        self.img = self.IMGS[0]
+
+        # Collision masks, built once per frame image. Stored under the same name as the
+        # frames, so invalidating "bird" drops both together
+        self.MASKS = assets.load(("bird", "masks"), lambda: {img: pygame.mask.from_surface(img) for img in self.IMGS})
+
+
+# Paint the three animation frames of the bird.
+    @staticmethod
+    def _create_frames():
+
+        imgs = [
             pygame.Surface((50, 35), pygame.SRCALPHA),
             pygame.Surface((50, 35), pygame.SRCALPHA),
             pygame.Surface((50, 35), pygame.SRCALPHA)
         ]
 
         # Draw more detailed bird shapes
-        for i, img in enumerate(self.IMGS):
+        for i, img in enumerate(imgs):
             # Yellow body (main ellipse)
             pygame.draw.ellipse(img, (255, 255, 0), (0, 0, 50, 35))
 
@@ -50,52 +78,64 @@ class Bird:
             # Add shading
             pygame.draw.ellipse(img, (220, 220, 0), (5, 5, 30, 25), 1)
 
-        # Initialize the image to avoid NoneType error
-        self.img = self.IMGS[0]
-
-
-# Make the bird jump.
-    def jump(self):
-
-        self.vel = -10.5
-        self.tick_count = 0
-        self.height = self.y
+        return imgs
 
 
-# Move the bird based on physics.
-    def move(self):
+# Draw the bird on the screen.
+    def draw(self, win, rect, bird):
 
-        self.tick_count += 1
+        x, y, width, height = rect
+        scale_factor_x = width / 600
+        scale_factor_y = height / 800
 
-        # Calculate displacement
-        displacement = self.vel * self.tick_count + 1.5 * self.tick_count ** 2
+        self._animate(bird.tilt)
 
-        # Terminal velocity
-        if displacement >= 16:
-            displacement = 16
+        # Rotated and scaled image with its shadow, from the table of this view size
+        rotations = assets.load_scaled(
+            ("bird", width, height), lambda: self._build_rotations(scale_factor_x, scale_factor_y))
+        frame = self.IMGS.index(self.img)
+        sprites = rotations.get((frame, bird.tilt))
+        if sprites is None:
+            # Tilt set from outside the physics: rotate it once and keep it
+            sprites = self._scale_frame(self.img, bird.tilt, scale_factor_x, scale_factor_y)
+            rotations[(frame, bird.tilt)] = sprites
+        scaled_img, shadow_img = sprites
 
-        if displacement < 0:
-            displacement -= 2
+        # Scale the position for the display rectangle
+        scaled_x = int(x + (bird.x * scale_factor_x))
+        scaled_y = int(y + (bird.y * scale_factor_y))
 
-        # Update position
-        self.y = self.y + displacement
+        # Add shadow for depth effect
+        win.blit(shadow_img, (scaled_x + 4, scaled_y + 4))
 
-        # Tilt bird
-        if displacement < 0 or self.y < self.height + 50:
-            if self.tilt < self.MAX_ROTATION:
-                self.tilt = self.MAX_ROTATION
-        else:
-            if self.tilt > -90:
-                self.tilt -= self.ROT_VEL
+        # Draw the image
+        win.blit(scaled_img, (scaled_x, scaled_y))
 
 
-# Draw the bird on the screen.
-    def draw(self, win, rect):
+# Draw many birds flying the same course, semi-transparent and in a single blits batch.
+# bird_x is shared by all of them; ys and tilts hold one entry per bird.
+    def draw_flock(self, win, rect, bird_x, ys, tilts):
 
         x, y, width, height = rect
         scale_factor_x = width / 600
         scale_factor_y = height / 800
 
+        self._animate(0)
+
+        sprites = assets.load_scaled(
+            ("bird", "flock", width, height), lambda: self._build_flock_sprites(scale_factor_x, scale_factor_y))
+        by_tilt = sprites[self.IMGS.index(self.img)]
+
+        # Scale the positions for the display rectangle, all at once
+        scaled_x = int(x + bird_x * scale_factor_x)
+        scaled_ys = (y + np.asarray(ys) * scale_factor_y).astype(int).tolist()
+
+        win.blits(zip(map(by_tilt.__getitem__, np.asarray(tilts).tolist()), zip(repeat(scaled_x), scaled_ys)), doreturn=False)
+
+
+# Advance the wing animation by one frame.
+    def _animate(self, tilt):
+
         # Animation
         self.img_count += 1
 
@@ -112,74 +152,97 @@ class Bird:
             self.img_count = 0
 
         # Don't flap when nose diving
-        if self.tilt <= -80:
+        if tilt <= -80:
             self.img = self.IMGS[1]
             self.img_count = self.ANIMATION_TIME * 2
 
+
+# Pre-render every (frame, tilt) the bird can show for a display rectangle.
+    def _build_rotations(self, scale_factor_x, scale_factor_y):
+
+        return {
+            (frame, tilt): self._scale_frame(img, tilt, scale_factor_x, scale_factor_y)
+            for frame, img in enumerate(self.IMGS)
+            for tilt in BIRD_TILTS
+        }
+
+
+# Pre-render the semi-transparent sprites of the flock for a display rectangle,
+# as {frame: {tilt: sprite}}.
+# The bird has no soft edges, so a colorkey plus surface alpha (RLE accelerated)
+# looks the same as per-pixel alpha and blits about twice as fast.
+    def _build_flock_sprites(self, scale_factor_x, scale_factor_y):
+
+        sprites = {frame: {} for frame in range(len(self.IMGS))}
+        for (frame, tilt), (scaled_img, shadow_img) in self._build_rotations(scale_factor_x, scale_factor_y).items():
+            sprite = pygame.Surface(scaled_img.get_size())
+            sprite.fill(self.FLOCK_COLORKEY)
+            sprite.blit(scaled_img, (0, 0))
+            sprite.set_colorkey(self.FLOCK_COLORKEY, pygame.RLEACCEL)
+            sprite.set_alpha(self.FLOCK_ALPHA, pygame.RLEACCEL)
+            sprites[frame][tilt] = sprite
+
+        return sprites
+
+
+# Rotate and scale a frame for a display rectangle, and build its shadow.
+    @staticmethod
+    def _scale_frame(img, tilt, scale_factor_x, scale_factor_y):
+
         # Rotate the image around the center
-        rotated_image = pygame.transform.rotate(self.img, self.tilt)
-        new_rect = rotated_image.get_rect(center=self.img.get_rect(topleft=(self.x, self.y)).center)
+        rotated_image = pygame.transform.rotate(img, tilt)
 
         # Scale the image for the display rectangle
         scaled_img = pygame.transform.scale(rotated_image,
                                             (int(rotated_image.get_width() * scale_factor_x),
                                              int(rotated_image.get_height() * scale_factor_y)))
 
-        # Scale the position for the display rectangle
-        scaled_x = int(x + (self.x * scale_factor_x))
-        scaled_y = int(y + (self.y * scale_factor_y))
-
-        # Add shadow for depth effect
         shadow_img = scaled_img.copy()
         shadow_img.fill((20, 20, 20, 100), None, pygame.BLEND_RGBA_MULT)
-        win.blit(shadow_img, (scaled_x + 4, scaled_y + 4))
 
-        # Draw the image
-        win.blit(scaled_img, (scaled_x, scaled_y))
+        return scaled_img, shadow_img
 
 
 # Get the mask for collision detection.
     def get_mask(self):
 
-        return pygame.mask.from_surface(self.img)
+        return self.MASKS[self.img]
 
 
 
 
-# Pipe class for the Flappy Bird game.
-class Pipe:
+# Sprite that draws the pipes of the game core.
+class PipeSprite:
 
 
-    GAP = 200
-    VEL = 5
+# Initialize the pipe sprite.
+    def __init__(self):
 
+        # Improved pipe surfaces, shared by every pipe
+        self.PIPE_TOP, self.PIPE_BOTTOM = assets.load(("pipe",), self._create_pipes)
 
-# Initialize the pipe.
-    def __init__(self, x):
+        # Collision masks, built once and invalidated together with the pipe surfaces
+        self.TOP_MASK, self.BOTTOM_MASK = assets.load(
+            ("pipe", "masks"), lambda: (pygame.mask.from_surface(self.PIPE_TOP), pygame.mask.from_surface(self.PIPE_BOTTOM)))
 
-        self.x = x
-        self.height = 0
-        self.gap = 200
-        self.passed = False
 
-        # Where the top and bottom of the pipe is
-        self.top = 0
-        self.bottom = 0
+# Paint the top and bottom pipe surfaces.
+    @classmethod
+    def _create_pipes(cls):
 
-        # Create improved pipe surfaces
-        self.PIPE_TOP = pygame.Surface((70, 500), pygame.SRCALPHA)
-        self.PIPE_BOTTOM = pygame.Surface((70, 500), pygame.SRCALPHA)
+        pipe_top = pygame.Surface((Pipe.WIDTH, Pipe.HEIGHT), pygame.SRCALPHA)
+        pipe_bottom = pygame.Surface((Pipe.WIDTH, Pipe.HEIGHT), pygame.SRCALPHA)
 
         # Draw more detailed pipes
-        self._draw_detailed_pipe(self.PIPE_TOP)
-        self._draw_detailed_pipe(self.PIPE_BOTTOM, is_top=False)
+        cls._draw_detailed_pipe(pipe_top)
+        cls._draw_detailed_pipe(pipe_bottom, is_top=False)
 
-        # Set the pipe position
-        self.set_height()
+        return pipe_top, pipe_bottom
 
 
 # Draw a detailed pipe with gradients and highlights.
-    def _draw_detailed_pipe(self, surface, is_top=True):
+    @staticmethod
+    def _draw_detailed_pipe(surface, is_top=True):
 
         width = 70
         height = 500
@@ -221,70 +284,67 @@ class Pipe:
             pygame.draw.line(surface, (0, 130, 0), (i, 0), (i, height), 1)
 
 
-# Set the height of the pipe from the top of the screen.
-    def set_height(self):
-
-        self.height = random.randrange(50, 450)
-        self.top = self.height - self.PIPE_TOP.get_height()
-        self.bottom = self.height + self.GAP
-
-
-# Move the pipe based on velocity.
-    def move(self):
-
-        self.x -= self.VEL
-
-
 # Draw both the top and bottom of the pipe.
-    def draw(self, win, rect):
+    def draw(self, win, rect, pipe):
 
         x, y, width, height = rect
         scale_factor_x = width / 600
         scale_factor_y = height / 800
 
         # Scale the position for the display rectangle
-        scaled_x = int(x + (self.x * scale_factor_x))
-        scaled_top_y = int(y + (self.top * scale_factor_y))
-        scaled_bottom_y = int(y + (self.bottom * scale_factor_y))
+        scaled_x = int(x + (pipe.x * scale_factor_x))
+        scaled_top_y = int(y + (pipe.top * scale_factor_y))
+        scaled_bottom_y = int(y + (pipe.bottom * scale_factor_y))
+
+        # Scaled pipes and shadows, cached per view size
+        scaled_pipe_top, scaled_pipe_bottom, top_shadow, bottom_shadow = assets.load_scaled(
+            ("pipe", width, height), lambda: self._scale_pipes(scale_factor_x, scale_factor_y))
+
+        # Add shadow for depth (slight offset)
+        win.blit(top_shadow, (scaled_x + 5, scaled_top_y))
+        win.blit(bottom_shadow, (scaled_x + 5, scaled_bottom_y))
+
+        # Draw the pipes
+        win.blit(scaled_pipe_top, (scaled_x, scaled_top_y))
+        win.blit(scaled_pipe_bottom, (scaled_x, scaled_bottom_y))
+
+
+# Scale both pipes for a display rectangle, and build their shadows.
+    def _scale_pipes(self, scale_factor_x, scale_factor_y):
 
         # Scale the pipes for the display rectangle
         scaled_pipe_width = int(self.PIPE_TOP.get_width() * scale_factor_x)
         scaled_top_height = int(self.PIPE_TOP.get_height() * scale_factor_y)
         scaled_bottom_height = int(self.PIPE_BOTTOM.get_height() * scale_factor_y)
 
-        # Create scaled pipes
         scaled_pipe_top = pygame.transform.scale(self.PIPE_TOP, (scaled_pipe_width, scaled_top_height))
         scaled_pipe_bottom = pygame.transform.scale(self.PIPE_BOTTOM, (scaled_pipe_width, scaled_bottom_height))
 
-        # Add shadow for depth (slight offset)
-        shadow_alpha = pygame.Surface((scaled_pipe_width, scaled_top_height), pygame.SRCALPHA)
-        shadow_alpha.fill((0, 0, 0, 50))
-        win.blit(shadow_alpha, (scaled_x + 5, scaled_top_y))
+        top_shadow = pygame.Surface((scaled_pipe_width, scaled_top_height), pygame.SRCALPHA)
+        top_shadow.fill((0, 0, 0, 50))
 
-        shadow_alpha = pygame.Surface((scaled_pipe_width, scaled_bottom_height), pygame.SRCALPHA)
-        shadow_alpha.fill((0, 0, 0, 50))
-        win.blit(shadow_alpha, (scaled_x + 5, scaled_bottom_y))
+        bottom_shadow = pygame.Surface((scaled_pipe_width, scaled_bottom_height), pygame.SRCALPHA)
+        bottom_shadow.fill((0, 0, 0, 50))
 
-        # Draw the pipes
-        win.blit(scaled_pipe_top, (scaled_x, scaled_top_y))
-        win.blit(scaled_pipe_bottom, (scaled_x, scaled_bottom_y))
+        return scaled_pipe_top, scaled_pipe_bottom, top_shadow, bottom_shadow
 
 
-# Check if the bird collides with the pipe.
-    def collide(self, bird, rect):
-
-        x, y, width, height = rect
-        scale_factor_x = width / 600
-        scale_factor_y = height / 800
+# Pixel-perfect collision test between a pipe and a bird using the sprite masks.
+# The game core uses the equivalent analytic test in core.Pipe.collide.
+    def collide(self, pipe, bird, bird_sprite):
 
         # Get masks for collision detection
-        bird_mask = bird.get_mask()
-        top_mask = pygame.mask.from_surface(self.PIPE_TOP)
-        bottom_mask = pygame.mask.from_surface(self.PIPE_BOTTOM)
+        bird_mask = bird_sprite.get_mask()
+        top_mask = self.TOP_MASK
+        bottom_mask = self.BOTTOM_MASK
+
+        # Skip the pixel test when the bird is outside the pipe's x-range
+        if pipe.x >= bird.x + bird_mask.get_size()[0] or pipe.x + top_mask.get_size()[0] <= bird.x:
+            return None
 
         # Offset for masks
-        top_offset = (self.x - bird.x, self.top - round(bird.y))
-        bottom_offset = (self.x - bird.x, self.bottom - round(bird.y))
+        top_offset = (pipe.x - bird.x, pipe.top - round(bird.y))
+        bottom_offset = (pipe.x - bird.x, pipe.bottom - round(bird.y))
 
         # Check for collision
         b_point = bird_mask.overlap(bottom_mask, bottom_offset)
@@ -302,7 +362,6 @@ class Base:
 
     VEL = 5
     WIDTH = 600
-    IMG = pygame.Surface((WIDTH, 150), pygame.SRCALPHA)
 
 
 # Initialize the base.
@@ -312,52 +371,57 @@ class Base:
         self.x1 = 0
         self.x2 = self.WIDTH
 
-        # Draw a more detailed and visually appealing base
-        self._create_detailed_base()
+        # A more detailed and visually appealing base, painted once per process
+        self.IMG = assets.load(("base", self.WIDTH), self._create_detailed_base)
 
 
 # Creates a more detailed base with ground texture and grass
     def _create_detailed_base(self):
 
+        img = pygame.Surface((self.WIDTH, 150), pygame.SRCALPHA)
+
         # Base ground color (brown)
-        pygame.draw.rect(self.IMG, (139, 69, 19), (0, 0, self.WIDTH, 150))
+        pygame.draw.rect(img, (139, 69, 19), (0, 0, self.WIDTH, 150))
 
         # Add ground texture pattern
         for i in range(0, self.WIDTH, 30):
             # Vertical dirt lines
-            pygame.draw.line(self.IMG, (120, 60, 15), (i, 0), (i, 150), 1)
+            pygame.draw.line(img, (120, 60, 15), (i, 0), (i, 150), 1)
 
         for j in range(0, 150, 20):
             # Horizontal dirt lines
-            pygame.draw.line(self.IMG, (160, 82, 45), (0, j), (self.WIDTH, j), 1)
+            pygame.draw.line(img, (160, 82, 45), (0, j), (self.WIDTH, j), 1)
 
         # Add random small stones
         for _ in range(50):
-            stone_x = random.randint(0, self.WIDTH)
-            stone_y = random.randint(20, 140)
-            stone_size = random.randint(2, 6)
-            stone_color = (100 + random.randint(0, 50), 50 + random.randint(0, 30), 10 + random.randint(0, 20))
-            pygame.draw.circle(self.IMG, stone_color, (stone_x, stone_y), stone_size)
+            stone_x = cosmetic_random.randint(0, self.WIDTH)
+            stone_y = cosmetic_random.randint(20, 140)
+            stone_size = cosmetic_random.randint(2, 6)
+            stone_color = (100 + cosmetic_random.randint(0, 50), 50 + cosmetic_random.randint(0, 30), 10 + cosmetic_random.randint(0, 20))
+            pygame.draw.circle(img, stone_color, (stone_x, stone_y), stone_size)
 
         # Add grass on top
         for i in range(0, self.WIDTH, 5):
-            grass_height = random.randint(5, 12)
-            grass_color = (0, 160 + random.randint(0, 40), 0)
-            pygame.draw.line(self.IMG, grass_color, (i, 0), (i, grass_height), 2)
+            grass_height = cosmetic_random.randint(5, 12)
+            grass_color = (0, 160 + cosmetic_random.randint(0, 40), 0)
+            pygame.draw.line(img, grass_color, (i, 0), (i, grass_height), 2)
+
+        return img
 
 
-# Move the base for scrolling effect.
-    def move(self):
+# Move the base for scrolling effect, by the given number of frames.
+    def move(self, ticks=1):
 
-        self.x1 -= self.VEL
-        self.x2 -= self.VEL
+        self.x1 -= self.VEL * ticks
+        self.x2 -= self.VEL * ticks
 
         # If the base is off the screen, reset position
-        if self.x1 + self.WIDTH < 0:
-            self.x1 = self.x2 + self.WIDTH
+        while self.x1 + self.WIDTH < 0 or self.x2 + self.WIDTH < 0:
+            if self.x1 + self.WIDTH < 0:
+                self.x1 = self.x2 + self.WIDTH
 
-        if self.x2 + self.WIDTH < 0:
-            self.x2 = self.x1 + self.WIDTH
+            if self.x2 + self.WIDTH < 0:
+                self.x2 = self.x1 + self.WIDTH
 
 
 # Draw the base.
@@ -376,8 +440,10 @@ class Base:
         scaled_width = int(self.WIDTH * scale_factor_x)
         scaled_height = int(self.IMG.get_height() * scale_factor_y)
 
-        # Create scaled bases
-        scaled_img = pygame.transform.scale(self.IMG, (scaled_width, scaled_height))
+        # Scaled base, cached per view size
+        scaled_img = assets.load_scaled(
+            ("base", self.WIDTH, width, height),
+            lambda: pygame.transform.scale(self.IMG, (scaled_width, scaled_height)))
 
         # Draw the bases
         win.blit(scaled_img, (scaled_x1, scaled_y))
@@ -398,18 +464,17 @@ class Cloud:
         self.speed = speed
         self.size = size
 
-        # Create cloud surface
+        # Cloud surface, shared by every cloud of the same size
         self.width = int(100 * size)
         self.height = int(50 * size)
-        self.cloud = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-
-        # Draw cloud shape
-        self._draw_cloud()
+        self.cloud = assets.load(("cloud", self.width, self.height), self._draw_cloud)
 
 
 # Draw a fluffy cloud shape
     def _draw_cloud(self):
 
+        cloud = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+
         # Cloud base color
         cloud_color = (250, 250, 250)
 
@@ -424,13 +489,15 @@ class Cloud:
         ]
 
         for x, y, radius in positions:
-            pygame.draw.circle(self.cloud, cloud_color, (int(x), int(y)), int(radius))
+            pygame.draw.circle(cloud, cloud_color, (int(x), int(y)), int(radius))
+
+        return cloud
 
 
-# Move cloud horizontally
-    def move(self):
+# Move cloud horizontally, by the given number of frames
+    def move(self, ticks=1):
 
-        self.x -= self.speed
+        self.x -= self.speed * ticks
 
 
 # Draw the cloud.
@@ -447,7 +514,9 @@ class Cloud:
         # Scale cloud
         scaled_width = int(self.width * scale_factor_x)
         scaled_height = int(self.height * scale_factor_y)
-        scaled_cloud = pygame.transform.scale(self.cloud, (scaled_width, scaled_height))
+        scaled_cloud = assets.load_scaled(
+            ("cloud", self.width, self.height, width, height),
+            lambda: pygame.transform.scale(self.cloud, (scaled_width, scaled_height)))
 
         # Draw cloud
         win.blit(scaled_cloud, (scaled_x, scaled_y))
@@ -473,8 +542,8 @@ class Background:
         self.clouds = []
         self.cloud_spawn_timer = 0
 
-        # Create sky gradient
-        self.sky = self._create_sky_gradient()
+        # Sky gradient, painted once per process
+        self.sky = assets.load(("sky", self.width, self.height), self._create_sky_gradient)
 
         # Add initial clouds
         for _ in range(4):
@@ -506,28 +575,28 @@ class Background:
 # Add a cloud with random properties
     def _add_random_cloud(self):
 
-        x = self.width + random.randint(0, 100)
-        y = random.randint(50, 300)
-        speed = random.uniform(0.2, 0.8)
-        size = random.uniform(0.5, 1.5)
+        x = self.width + cosmetic_random.randint(0, 100)
+        y = cosmetic_random.randint(50, 300)
+        speed = cosmetic_random.uniform(0.2, 0.8)
+        size = cosmetic_random.uniform(0.5, 1.5)
         self.clouds.append(Cloud(x, y, speed, size))
 
 
-# Update background elements
-    def update(self):
+# Update background elements, by the given number of frames
+    def update(self, ticks=1):
 
         # Update cloud timer
-        self.cloud_spawn_timer += 1
+        self.cloud_spawn_timer += ticks
 
         # Add new cloud occasionally
-        if self.cloud_spawn_timer > 120:  # Every ~2 seconds
+        while self.cloud_spawn_timer > 120:  # Every ~2 seconds
             self._add_random_cloud()
-            self.cloud_spawn_timer = 0
+            self.cloud_spawn_timer -= 121
 
         # Move clouds and remove if off-screen
         clouds_to_remove = []
         for cloud in self.clouds:
-            cloud.move()
+            cloud.move(ticks)
             if cloud.is_off_screen(self.width):
                 clouds_to_remove.append(cloud)
 
@@ -540,8 +609,10 @@ class Background:
 
         x, y, width, height = rect
 
-        # Draw sky
-        scaled_sky = pygame.transform.scale(self.sky, (width, height))
+        # Draw sky, scaled once per view size
+        scaled_sky = assets.load_scaled(
+            ("sky", self.width, self.height, width, height),
+            lambda: pygame.transform.scale(self.sky, (width, height)))
         win.blit(scaled_sky, (x, y))
 
         # Draw clouds
@@ -551,38 +622,44 @@ class Background:
 
 
 
-# Main game class for Flappy Bird.
-class FlappyBird:
+# Renderer that attaches to a game core and draws it. Only games on screen need one.
+class GameRenderer:
 
 
-# Initialize the game.
-    def __init__(self):
+    # Views narrower than this are drawn with the low-detail path
+    LOW_DETAIL_WIDTH = 200
 
-        # Game elements
-        self.bird = Bird(230, 350)
-        self.base = Base(730)
-        self.pipes = [Pipe(700)]
-        self.score = 0
-        self.clock = pygame.time.Clock()
-        self.background = Background(600, 800)
+    # Most frames of clouds and ground scrolling caught up in a single draw
+    MAX_CATCH_UP = 120
 
-        # Font for improved text rendering
-        pygame.font.init()  # Make sure font module is initialized
-        self.score_font = None
-        try:
-            self.score_font = pygame.font.Font(None, 50)  # Default font
-        except:
-            self.score_font = pygame.font.SysFont("Arial", 50)
+    # Flat colors of the low-detail path
+    LOW_DETAIL_SKY = (118, 193, 252)
+    LOW_DETAIL_PIPE = (0, 150, 0)
+    LOW_DETAIL_GROUND = (139, 69, 19)
+    LOW_DETAIL_GRASS = (0, 170, 0)
 
-        self.message_font = None
-        try:
-            self.message_font = pygame.font.Font(None, 36)
-        except:
-            self.message_font = pygame.font.SysFont("Arial", 36)
 
-        # Game state
-        self.active = True
-        self.passed_pipe = False
+# Initialize the renderer for the given game.
+    def __init__(self, game):
+
+        # Game being drawn
+        self.game = game
+        self.last_score = game.score
+
+        # Visual elements. The background and its clouds are only created the first
+        # time the game is drawn in full detail.
+        self.bird = BirdSprite()
+        self.pipe = PipeSprite()
+        self.base = Base(GROUND_Y)
+        self.background = None
+
+        # Frames played since the clouds and the ground were last advanced
+        self.pending_ticks = 0
+
+        # Font for improved text rendering
+        pygame.font.init()  # Make sure font module is initialized
+        self.score_font = self._font(50)
+        self.message_font = self._font(36)
 
         # Animation effects
         self.score_animation = 0
@@ -599,104 +676,93 @@ class FlappyBird:
         #     self.hit_sound = None
 
 
-# Update the game state.
-    def update(self):
+# Shared font of the given size: the default font, or Arial if it is not available.
+    @staticmethod
+    def _font(size):
 
-        if not self.active:
-            return "dead"
-
-        # Update background
-        self.background.update()
-
-        # Move the bird
-        self.bird.move()
-
-        # Check for ground collision
-        if self.bird.y + self.bird.img.get_height() >= 730 or self.bird.y < 0:
-            self.active = False
-            # if self.hit_sound:
-            #     self.hit_sound.play()
-            return "dead"
-
-        # Add a new pipe when needed
-        pipe_ind = 0
-        if len(self.pipes) > 1 and self.bird.x > self.pipes[0].x + self.pipes[0].PIPE_TOP.get_width():
-            pipe_ind = 1
-
-        # Move the pipes
-        add_pipe = False
-        pipes_to_remove = []
-        for pipe in self.pipes:
-            # Check for collision
-            if pipe.collide(self.bird, (0, 0, 600, 800)):
-                self.active = False
-                # if self.hit_sound:
-                #     self.hit_sound.play()
-                return "dead"
-
-            # Check if pipe is off the screen
-            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
-                pipes_to_remove.append(pipe)
-
-            # Check if bird passed the pipe
-            if not pipe.passed and pipe.x < self.bird.x:
-                pipe.passed = True
-                add_pipe = True
-
-            # Move the pipe
-            pipe.move()
-
-        # Add score and new pipe if bird passed a pipe
-        if add_pipe:
-            self.score += 1
-            self.score_animation = 10  # Start score animation
+        try:
+            return assets.font(size)  # Default font
+        except:
+            return assets.font(size, "Arial")
+
+
+# Point the renderer to another game, keeping the visual elements.
+    def attach(self, game):
+
+        self.game = game
+        self.last_score = game.score
+
+
+# Advance the visual elements by `ticks` simulated frames (one by default, more when the
+# game is drawn less often than it is simulated). Clouds and ground scrolling are only
+# counted here and caught up lazily by _advance_scenery when the game is drawn.
+    def update(self, ticks=1):
+
+        self.pending_ticks += ticks
+
+        # Start score animation when the bird scores
+        if self.game.score > self.last_score:
+            self.score_animation = 10
             # if self.score_sound:
             #     self.score_sound.play()
-            self.pipes.append(Pipe(600))
-
-        # Remove pipes that are off the screen
-        for pipe in pipes_to_remove:
-            self.pipes.remove(pipe)
+        self.last_score = self.game.score
 
         # Decrease score animation counter
         if self.score_animation > 0:
             self.score_animation -= 1
 
-        # Move the base
-        self.base.move()
 
-        return "alive"
+# Bring clouds and ground up to date with the frames played since the last draw.
+    def _advance_scenery(self):
 
+        if self.background is None:
+            self.background = Background(WIN_WIDTH, WIN_HEIGHT)
 
-# Draw the game elements on the window.
-    def draw(self, win, rect):
+        ticks = min(self.pending_ticks, self.MAX_CATCH_UP)
+        self.pending_ticks = 0
+        if ticks:
+            self.background.update(ticks)
+            self.base.move(ticks)
+
+
+# Draw the game elements on the window. With flock = (bird_x, ys, tilts) every bird
+# of the flock is drawn over the course instead of the game's own bird.
+    def draw(self, win, rect, flock=None):
 
         x, y, width, height = rect
+        game = self.game
+
+        # Small thumbnails don't need the full scene
+        if width < self.LOW_DETAIL_WIDTH:
+            self.draw_low_detail(win, rect)
+            return
+
+        self._advance_scenery()
 
         # Draw background with sky and clouds
         self.background.draw(win, rect)
 
         # Draw pipes
-        for pipe in self.pipes:
-            pipe.draw(win, rect)
+        for pipe in game.pipes:
+            self.pipe.draw(win, rect, pipe)
 
         # Draw base
         self.base.draw(win, rect)
 
-        # Draw bird
-        self.bird.draw(win, rect)
+        # Draw bird, or the whole flock
+        if flock is None:
+            self.bird.draw(win, rect, game.bird)
+        else:
+            self.bird.draw_flock(win, rect, *flock)
 
         # Draw score with improved visuals
         if width > 200:  # Only draw score if the display is large enough
             # Score text with shadow
-            score_str = str(self.score)
+            score_str = str(game.score)
 
             # Determine font size based on display size
             font_size = int(50 * (width / 600))
-            if self.score_font:
-                self.score_font = pygame.font.Font(None, font_size)
-            else:
-                self.score_font = pygame.font.SysFont("Arial", font_size)
+            self.score_font = self._font(font_size)
 
             # Dynamic size for score animation effect
             size_boost = self.score_animation / 2
@@ -704,14 +770,14 @@ class FlappyBird:
 
             if self.score_animation > 0:
                 # Animated score when player scores a point
-                score_font = pygame.font.Font(None, animated_size)
-                score_text = score_font.render(score_str, True, (255, 215, 0))  # Gold color
+                score_font = self._font(animated_size)
+                score_text = assets.render_text(score_font, score_str, (255, 215, 0))  # Gold color
             else:
                 # Normal score display
-                score_text = self.score_font.render(score_str, True, (255, 255, 255))
+                score_text = assets.render_text(self.score_font, score_str, (255, 255, 255))
 
             # Add shadow for better visibility
-            shadow_text = self.score_font.render(score_str, True, (0, 0, 0))
+            shadow_text = assets.render_text(self.score_font, score_str, (0, 0, 0))
             shadow_offset = max(2, int(4 * (width / 600)))
 
             # Center position
@@ -723,11 +789,11 @@ class FlappyBird:
             win.blit(score_text, (text_x, text_y))
 
         # Draw game over message if game is not active
-        if not self.active and width > 200:
+        if not game.active and width > 200:
             # Game over text
             if self.message_font:
-                game_over_text = self.message_font.render("Game Over", True, (200, 30, 30))
-                restart_text = self.message_font.render("Press Space to Restart", True, (255, 255, 255))
+                game_over_text = assets.render_text(self.message_font, "Game Over", (200, 30, 30))
+                restart_text = assets.render_text(self.message_font, "Press Space to Restart", (255, 255, 255))
 
                 # Center position
                 go_x = x + width / 2 - game_over_text.get_width() / 2
@@ -737,11 +803,96 @@ class FlappyBird:
                 restart_y = go_y + 50
 
                 # Draw text with shadow for better visibility
-                shadow_go = self.message_font.render("Game Over", True, (0, 0, 0))
-                shadow_restart = self.message_font.render("Press Space to Restart", True, (0, 0, 0))
+                shadow_go = assets.render_text(self.message_font, "Game Over", (0, 0, 0))
+                shadow_restart = assets.render_text(self.message_font, "Press Space to Restart", (0, 0, 0))
 
                 win.blit(shadow_go, (go_x + 2, go_y + 2))
                 win.blit(game_over_text, (go_x, go_y))
 
                 win.blit(shadow_restart, (restart_x + 2, restart_y + 2))
-                win.blit(restart_text, (restart_x, restart_y))
\ No newline at end of file
+                win.blit(restart_text, (restart_x, restart_y))
+
+
+# Draw the game with flat colors and an unrotated bird, for small views.
+# Everything is a blit of a surface cached per view size (blits beat large fills).
+    def draw_low_detail(self, win, rect):
+
+        view = pygame.Rect(rect)
+        x, y, width, height = view
+        scale_factor_x = width / 600
+        scale_factor_y = height / 800
+
+        # Solid sky and ground
+        background = assets.load_scaled(
+            ("background_low_detail", width, height),
+            lambda: self._create_low_detail_background(width, height, scale_factor_y))
+        win.blit(background, view)
+
+        # Pipes as flat rectangles
+        pipe_img = assets.load_scaled(
+            ("pipe_low_detail", width, height),
+            lambda: self._create_flat_surface(Pipe.WIDTH * scale_factor_x, Pipe.HEIGHT * scale_factor_y, self.LOW_DETAIL_PIPE))
+        for pipe in self.game.pipes:
+            pipe_x = x + int(pipe.x * scale_factor_x)
+            for pipe_y in (pipe.top, pipe.bottom):
+                dest = pipe_img.get_rect(topleft=(pipe_x, y + int(pipe_y * scale_factor_y)))
+                visible = dest.clip(view)
+                win.blit(pipe_img, visible, visible.move(-dest.x, -dest.y))
+
+        # Tiny bird, scaled once per view size
+        bird = self.game.bird
+        bird_img = assets.load_scaled(
+            ("bird", "low_detail", width, height),
+            lambda: pygame.transform.scale(self.bird.IMGS[0], (max(1, int(Bird.WIDTH * scale_factor_x)),
+                                                               max(1, int(Bird.HEIGHT * scale_factor_y)))))
+        win.blit(bird_img, (int(x + bird.x * scale_factor_x), int(y + bird.y * scale_factor_y)))
+
+
+# Paint the flat sky and ground of the low-detail view.
+    def _create_low_detail_background(self, width, height, scale_factor_y):
+
+        background = self._create_flat_surface(width, height, self.LOW_DETAIL_SKY)
+        ground_y = int(GROUND_Y * scale_factor_y)
+        background.fill(self.LOW_DETAIL_GROUND, (0, ground_y, width, height - ground_y))
+        background.fill(self.LOW_DETAIL_GRASS, (0, ground_y, width, 2))
+
+        return background
+
+
+# Create an opaque surface of a single color.
+    @staticmethod
+    def _create_flat_surface(width, height, color):
+
+        surface = pygame.Surface((max(1, int(width)), max(1, int(height))))
+        surface.fill(color)
+
+        return surface
+
+
+
+
+# Flappy Bird game with a renderer attached, for games that are always on screen.
+class FlappyBird(FlappyGame):
+
+
+# Initialize the game and its renderer.
+    def __init__(self, course=None):
+
+        super().__init__(course)
+        self.renderer = GameRenderer(self)
+
+
+# Update the game state and its visual elements.
+    def update(self):
+
+        result = super().update()
+        if result == "alive":
+            self.renderer.update()
+
+        return result
+
+
+# Draw the game elements on the window.
+    def draw(self, win, rect, flock=None):
+
+        self.renderer.draw(win, rect, flock)
@@ -0,0 +1,234 @@
+from evaluation import RunSeeds, play
+from configparser import ConfigParser
+from itertools import count
+import multiprocessing
+import tempfile
+import random
+import queue
+import copy
+import neat
+import os
+
+
+
+
+# Generaciones entre dos migraciones y genomas que envía cada isla a la siguiente
+MIGRATION_INTERVAL = 5
+MIGRANTS = 2
+
+
+# Cada isla numera sus nodos nuevos en su propio rango, para que los genomas que llegan
+# de otra isla nunca tengan un nodo con la misma clave que uno creado aquí
+NODE_KEYS_PER_ISLAND = 10 ** 6
+
+
+
+
+#    Configuración NEAT de una isla: config.txt con los valores de overrides (un fichero
+#    con las mismas secciones y solo las claves que cambian) por encima
+def island_config(config_path, overrides=None):
+
+    parameters = ConfigParser()
+    parameters.read([config_path] + ([overrides] if overrides else []))
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        parameters.write(f)
+    try:
+        return neat.config.Config(
+            neat.DefaultGenome,
+            neat.DefaultReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            f.name
+        )
+    finally:
+        os.remove(f.name)
+
+
+
+
+# Reporter de cada isla: envía al proceso principal las estadísticas de cada generación
+# y guarda copia de los mejores genomas, que son los que emigran
+class IslandReporter(neat.reporting.BaseReporter):
+
+
+#    Inicializa el reporter de la isla index
+    def __init__(self, index, stats, migrants):
+
+        self.index = index
+        self.stats = stats
+        self.migrants = migrants
+        self.generation = 0
+        self.top = []
+        self.solved = False
+
+
+    def start_generation(self, generation):
+
+        self.generation = generation
+
+
+#    Envía las estadísticas de la generación evaluada y guarda los emigrantes
+    def post_evaluate(self, config, population, species, best_genome):
+
+        ranked = sorted(population.values(), key=lambda genome: genome.fitness, reverse=True)
+        self.top = [copy.deepcopy(genome) for genome in ranked[:self.migrants]]
+
+        mean = sum(genome.fitness for genome in ranked) / len(ranked)
+        self.stats.put(("generation", self.index, self.generation, best_genome.fitness, mean,
+                        len(species.species), copy.deepcopy(best_genome)))
+
+
+    def found_solution(self, config, generation, best):
+
+        self.solved = True
+
+
+
+
+#    Envía los emigrantes a la siguiente isla del anillo, espera los de la anterior y los
+#    pone en lugar de los genomas más nuevos de la población. Devuelve False si se pidió parar
+def migrate(population, emigrants, inboxes, index, stop):
+
+    inboxes[(index + 1) % len(inboxes)].put(emigrants)
+
+    immigrants = None
+    while immigrants is None:
+        if stop.is_set():
+            return False
+        try:
+            immigrants = inboxes[index].get(timeout=0.5)
+        except queue.Empty:
+            pass
+
+    for key, genome in zip(sorted(population.population)[-len(immigrants):], immigrants):
+        del population.population[key]
+        genome.key = next(population.reproduction.genome_indexer)
+        genome.fitness = None
+        population.population[genome.key] = genome
+
+    population.species.speciate(population.config, population.population, population.generation)
+    return True
+
+
+#    Proceso de una isla: evoluciona su propia población sin pantalla y migra cada interval
+#    generaciones. Al terminar, también si falla (p. ej. extinción completa), envía
+#    ("done", index, mejor genoma o None, resuelto). Si falla además pide parar al resto de
+#    islas, que si no se quedarían esperando sus emigrantes
+def run_island(index, config_path, overrides, seed, generations, budget, interval, migrants, sampling,
+               inboxes, stats, stop):
+
+    population = None
+    reporter = None
+    try:
+        config = island_config(config_path, overrides)
+        first_key = max(len(config.genome_config.output_keys), index * NODE_KEYS_PER_ISLAND)
+        config.genome_config.node_indexer = count(first_key)
+
+        seeds = RunSeeds(seed)
+        random.seed(seeds.neat_seed)
+
+        population = neat.Population(config)
+        reporter = IslandReporter(index, stats, migrants)
+        population.add_reporter(reporter)
+
+        #    Fitness de la generación, jugada entera en un lote sobre un curso de la isla
+        def evaluate(genomes_list, config):
+
+            genomes = [genome for genome_id, genome in genomes_list]
+            fitness, capped = play(genomes, config, seeds.course_seed(), budget, sampling)
+            for genome, genome_fitness in zip(genomes, fitness):
+                genome.fitness = float(genome_fitness)
+
+        done = 0
+        while done < generations and not stop.is_set():
+            span = min(interval, generations - done)
+            population.run(evaluate, span)
+            done += span
+
+            if reporter.solved:
+                break
+            if done < generations and len(inboxes) > 1:
+                if not migrate(population, reporter.top, inboxes, index, stop):
+                    break
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        best_genome = population.best_genome if population is not None else None
+        stats.put(("done", index, best_genome, reporter is not None and reporter.solved))
+
+
+
+
+# Modelo de islas: N poblaciones NEAT, cada una en su proceso y con su propia configuración,
+# que se pasan sus mejores genomas en anillo cada `interval` generaciones. La isla i juega
+# con las semillas RunSeeds([seed, i]), así que toda la ejecución se repite con la misma seed.
+class IslandModel:
+
+
+#    Arranca un proceso por isla. overrides es una lista de ficheros que se reparten en orden
+#    entre las islas (vacía: todas usan config.txt tal cual)
+    def __init__(self, config_path, islands, overrides=(), seed=0, generations=100, budget=None,
+                 interval=MIGRATION_INTERVAL, migrants=MIGRANTS, sampling=None):
+
+        self.islands = islands
+        self.stats = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        inboxes = [multiprocessing.Queue() for _ in range(islands)]
+
+        self.processes = []
+        for index in range(islands):
+            island_overrides = overrides[index % len(overrides)] if overrides else None
+            process = multiprocessing.Process(
+                target=run_island, name=f"isla-{index + 1}", daemon=True,
+                args=(index, config_path, island_overrides, [seed, index], generations, budget,
+                      interval, migrants, sampling, inboxes, self.stats, self.stop_event))
+            process.start()
+            self.processes.append(process)
+
+        self.finished = 0
+
+
+#    Mensajes recibidos de las islas desde la última llamada, sin esperar
+    def poll(self):
+
+        messages = []
+        while True:
+            try:
+                message = self.stats.get_nowait()
+            except queue.Empty:
+                return messages
+
+            if message[0] == "done":
+                self.finished += 1
+            messages.append(message)
+
+
+#    Indica si alguna isla sigue evolucionando. Un proceso que ya no está vivo cuenta como
+#    terminado aunque no llegara a enviar "done", para que un fallo grave no bloquee el bucle.
+#    Si alguno terminó con error se pide parar al resto, que esperarían sus emigrantes
+    def running(self):
+
+        if any(process.exitcode not in (None, 0) for process in self.processes):
+            self.stop_event.set()
+
+        exited = sum(not process.is_alive() for process in self.processes)
+        return max(self.finished, exited) < self.islands
+
+
+#    Pide a las islas que terminen tras su tanda de generaciones actual
+    def stop(self):
+
+        self.stop_event.set()
+
+
+#    Pide parar y espera a que terminen los procesos. Mientras tanto se sigue vaciando la
+#    cola de estadísticas: un proceso no termina hasta que se leen los datos que envió
+    def close(self):
+
+        self.stop_event.set()
+        for process in self.processes:
+            while process.is_alive():
+                self.poll()
+                process.join(0.1)
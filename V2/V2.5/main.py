@@ -1,9 +1,20 @@
 import pygame
-from game import FlappyBird
+import assets
+from game import FlappyBird, seed_cosmetics
+from batch import FlappyBatch
+from network import BatchNetwork, CompileCacheReporter
+from evaluation import (ParallelEvaluator, EpisodeBudget, BudgetReporter, FitnessCache, RunSeeds, CourseSampling,
+                        MAX_FRAMES, step)
+from scheduler import SpeedControl, DISPLAY_HZ
+from recorder import FrameRecorder
+from islands import IslandModel, MIGRATION_INTERVAL, MIGRANTS
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 from visualize import draw_net, plot_stats
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import argparse
 import random
 import pickle
 import time
@@ -33,6 +44,7 @@ MAIN_GAME_HEIGHT = 480
 MINI_GAME_WIDTH = 160
 MINI_GAME_HEIGHT = 120
 MINI_GAMES_PER_COLUMN = 9
+DISPLAY_GAMES = 1 + MINI_GAMES_PER_COLUMN * 2  # Juego principal + dos columnas de mini-juegos
 
 
 # Dimensiones para paneles inferiores
@@ -45,6 +57,13 @@ PADDING = 15
 WIDGET_SPACING = 10
 
 
+# Columnas de mini-juegos: posición x, título, índice del primer juego y fondo de las celdas
+MINI_GAME_COLUMNS = (
+    (MARGIN, "Birds 1-9", 1, (5, 5, 5)),
+    (SCREEN_WIDTH - SCREEN_WIDTH // 4, "Birds 10-18", 10, (2, 2, 2)),
+)
+
+
 # Paleta de colores
 BG_COLOR = (10, 10, 10)
 HIGHLIGHT_COLOR = (40, 40, 40)
@@ -95,22 +114,11 @@ LARGE_FONT_COLOR_MESSAGE_MAIN = DANGER_COLOR
 
 
 
-# Inicializacion de PyGame
-pygame.init()
-
-
-# Sistema de tipografías coherente
-SMALL_FONT = pygame.font.SysFont("Arial", 15)
-NORMAL_FONT = pygame.font.SysFont("Arial", 17)
-STAT_FONT = pygame.font.SysFont("Arial", 20)
-HEADER_FONT = pygame.font.SysFont("Arial", 30, bold=True)
-TITLE_FONT = pygame.font.SysFont("Arial", 25, bold=True)
-LARGE_FONT = pygame.font.SysFont("Arial", 30, bold=True)
-
-
-# Inicialización de la ventana
-WINDOW = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("NEAT Flappy Bird - AI Training Visualization")
+# Ventana y tipografías; se crean en init_display y no al importar el módulo, porque los
+# procesos de ParallelEvaluator e IslandModel lo vuelven a importar al arrancar con spawn
+# y cada uno abriría su propia ventana
+WINDOW = None
+SMALL_FONT = NORMAL_FONT = STAT_FONT = HEADER_FONT = TITLE_FONT = LARGE_FONT = None
 
 
 # Variables globales para estadísticas
@@ -120,6 +128,56 @@ generation_fitnesses = []
 generation_best_fitness = 0
 all_time_best_genome = None
 games = []
+birds_alive = 0
+
+# Con varios cursos (ver --courses), mientras se juega la generación el mejor fitness actual
+# es el de un carril en un solo curso; al terminar pasa a ser el fitness combinado
+generation_best_per_course = False
+
+# Velocidad del entrenamiento, cambiable desde el teclado (ver handle_events)
+speed_control = SpeedControl()
+
+# Vista superpuesta: el juego principal dibuja todos los pájaros vivos sobre un mismo
+# curso. overlay_flock guarda (x, alturas, inclinaciones) de los pájaros del último frame
+overlay_mode = False
+overlay_flock = None
+
+# Curso y frame del último lote mostrado, para saber cuántos pasos se simularon desde
+# entonces y adelantar nubes y suelo lo mismo que las tuberías
+shown_course_frame = None
+
+# Superficies fuera de pantalla de cada vista de juego y, opcionalmente, hilos para
+# componer las miniaturas en paralelo (ver --render-threads)
+view_surfaces = {}
+render_threads = 0
+render_pool = None
+
+# Presupuesto de cada generación (ver --max-frames y --max-score) y su reporter
+episode_budget = EpisodeBudget(MAX_FRAMES)
+budget_reporter = BudgetReporter()
+
+# Cursos en los que se puntúa cada genoma (ver --courses y --aggregate)
+course_sampling = CourseSampling()
+
+# Semillas de la ejecución (ver --seed) y semilla fija del curso de todas las generaciones
+# (ver --course-seed); con None cada generación juega el curso que sale de run_seeds.
+# Con un curso fijo la caché de fitness de --fitness-cache reutiliza resultados
+run_seeds = RunSeeds()
+fixed_course_seed = None
+fitness_cache = None
+
+# Grabación de la ventana (ver --record); None si no se graba
+recorder = None
+
+# Gráfico de fitness: "matplotlib" o "pygame" (más ligero), y la última imagen generada
+fitness_graph_backend = "matplotlib"
+fitness_graph_cache = None
+
+# Dashboard retenido: capa con el marco estático, estado de cada región dibujada
+# y si el próximo frame debe enviarse completo a la pantalla
+static_layer = None
+dashboard_state = {}
+dashboard_full_update = True
 
 
 
@@ -129,6 +187,29 @@ games = []
 
 
 
+#    Inicializa PyGame, crea las tipografías (cada fuente una sola vez) y abre la ventana.
+#    Solo la primera llamada hace algo
+def init_display():
+
+    global WINDOW, SMALL_FONT, NORMAL_FONT, STAT_FONT, HEADER_FONT, TITLE_FONT, LARGE_FONT
+
+    if WINDOW is not None:
+        return WINDOW
+
+    pygame.init()
+
+    SMALL_FONT = assets.font(15, "Arial")
+    NORMAL_FONT = assets.font(17, "Arial")
+    STAT_FONT = assets.font(20, "Arial")
+    HEADER_FONT = assets.font(30, "Arial", bold=True)
+    TITLE_FONT = assets.font(25, "Arial", bold=True)
+    LARGE_FONT = assets.font(30, "Arial", bold=True)
+
+    WINDOW = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("NEAT Flappy Bird - AI Training Visualization")
+    return WINDOW
+
+
 #    Dibuja un panel con bordes opcionales y esquinas redondeadas
 def draw_panel(surface, rect, color=PANEL_BG, border=True, border_radius=8):
 
@@ -142,24 +223,87 @@ def draw_panel(surface, rect, color=PANEL_BG, border=True, border_radius=8):
 def draw_header(surface, rect, text, color=HIGHLIGHT_COLOR, text_color=HEADER_FONT_COLOR_PANEL_TITLE):
 
     pygame.draw.rect(surface, color, rect, border_radius=8)
-    text_surf = HEADER_FONT.render(text, True, text_color)
+    text_surf = assets.render_text(HEADER_FONT, text, text_color)
     text_x = rect.left + (rect.width - text_surf.get_width()) // 2
     text_y = rect.top + (rect.height - text_surf.get_height()) // 2
     surface.blit(text_surf, (text_x, text_y))
 
 
-#    Dibuja un indicador KPI con etiqueta y valor
-def draw_kpi(surface, rect, label, value, value_color=LARGE_FONT_COLOR_KPI_VALUE_DEFAULT):
+#    Dibuja el marco de un indicador KPI: panel y etiqueta
+def draw_kpi_frame(surface, rect, label):
 
     draw_panel(surface, rect)
-    label_surf = STAT_FONT.render(label, True, STAT_FONT_COLOR_KPI_LABEL)
+    label_surf = assets.render_text(STAT_FONT, label, STAT_FONT_COLOR_KPI_LABEL)
     label_x = rect.left + (rect.width - label_surf.get_width()) // 2
     surface.blit(label_surf, (label_x, rect.top + PADDING))
-    value_surf = LARGE_FONT.render(str(value), True, value_color)
+
+
+#    Dibuja el valor de un indicador KPI dentro de su marco. Con una tupla (valor, detalle)
+#    el detalle va en una segunda línea más pequeña. Todo se recorta al marco, para que un
+#    texto largo no deje restos fuera de la región que se redibuja
+def draw_kpi_value(surface, rect, value, value_color=LARGE_FONT_COLOR_KPI_VALUE_DEFAULT):
+
+    value, detail = value if isinstance(value, tuple) else (value, None)
+
+    surface.set_clip(rect)
+    value_surf = assets.render_text(LARGE_FONT, str(value), value_color)
     value_x = rect.left + (rect.width - value_surf.get_width()) // 2
-    value_y = rect.top + label_surf.get_height() + PADDING
+    value_y = rect.top + STAT_FONT.get_height() + PADDING
     surface.blit(value_surf, (value_x, value_y))
 
+    if detail is not None:
+        detail_surf = assets.render_text(NORMAL_FONT, str(detail), value_color)
+        detail_x = rect.left + (rect.width - detail_surf.get_width()) // 2
+        surface.blit(detail_surf, (detail_x, value_y + value_surf.get_height()))
+    surface.set_clip(None)
+
+
+#    Dibuja un indicador KPI con etiqueta y valor
+def draw_kpi(surface, rect, label, value, value_color=LARGE_FONT_COLOR_KPI_VALUE_DEFAULT):
+
+    draw_kpi_frame(surface, rect, label)
+    draw_kpi_value(surface, rect, value, value_color)
+
+
+#    Dibuja un juego dentro de su vista, recortando lo que se salga de ella.
+#    Con flock se dibuja toda la bandada sobre el curso del juego.
+def draw_game_view(surface, game, view_rect, flock=None):
+
+    surface.set_clip(view_rect)
+    game.draw(surface, view_rect, flock)
+    surface.set_clip(None)
+
+
+
+
+# CAPA ESTÁTICA Y REGIONES SUCIAS
+# El marco del dashboard (paneles, encabezados, etiquetas y la tabla de configuración)
+# se dibuja una sola vez en static_layer. En cada frame solo se redibujan, sobre esa
+# capa, las regiones cuyo contenido cambió, y solo esas se envían a la pantalla.
+
+
+
+
+#    Redibuja una región si su estado cambió desde el último frame: restaura el fondo
+#    desde la capa estática, llama a draw() y la añade a la lista de regiones sucias
+def refresh_region(surface, dirty, rect, state, draw):
+
+    key = tuple(rect)
+    if key in dashboard_state and dashboard_state[key] == state:
+        return
+
+    surface.blit(static_layer, rect, rect)
+    draw()
+    dirty.append(pygame.Rect(rect))
+    dashboard_state[key] = state
+
+
+#    Fuerza a redibujar y enviar a la pantalla el dashboard completo en el próximo frame
+def invalidate_dashboard():
+
+    global dashboard_full_update
+    dashboard_full_update = True
+
 
 
 
@@ -168,8 +312,8 @@ def draw_kpi(surface, rect, label, value, value_color=LARGE_FONT_COLOR_KPI_VALUE
 
 
 
-#     Dibuja el panel de estadísticas global en la parte superior
-def draw_stats_panel(surface):
+#    Rectángulos del panel de estadísticas: panel, encabezado y los cinco KPIs
+def stats_panel_layout():
 
     # Panel principal de estadísticas
     stats_panel = pygame.Rect(
@@ -178,7 +322,6 @@ def draw_stats_panel(surface):
         SCREEN_WIDTH - MARGIN * 2,
         STATS_PANEL_HEIGHT
     )
-    draw_panel(surface, stats_panel)
 
     # Encabezado del panel
     header_rect = pygame.Rect(
@@ -187,145 +330,239 @@ def draw_stats_panel(surface):
         stats_panel.width,
         50
     )
-    draw_header(surface, header_rect, "ESTADÍSTICAS DE ENTRENAMIENTO")
 
     # Distribución de KPIs en fila
-    kpi_width = (stats_panel.width - PADDING * 5) // 4
+    kpi_width = (stats_panel.width - PADDING * 6) // 5
     kpi_height = stats_panel.height - header_rect.height - PADDING * 2
+    kpi_rects = [
+        pygame.Rect(
+            stats_panel.left + PADDING + i * (kpi_width + PADDING),
+            header_rect.bottom + PADDING,
+            kpi_width,
+            kpi_height
+        )
+        for i in range(5)
+    ]
 
-    # KPI: Generación actual
-    gen_kpi_rect = pygame.Rect(
-        stats_panel.left + PADDING,
-        header_rect.bottom + PADDING,
-        kpi_width,
-        kpi_height
-    )
-    draw_kpi(surface, gen_kpi_rect, "Generación Actual", generation)
+    return stats_panel, header_rect, kpi_rects
 
-    # KPI: Birds vivos
-    birds_kpi_rect = pygame.Rect(
-        gen_kpi_rect.right + PADDING,
-        header_rect.bottom + PADDING,
-        kpi_width,
-        kpi_height
-    )
-    draw_kpi(surface, birds_kpi_rect, "Birds Vivos", len(games), SUCCESS_COLOR)
 
-    # KPI: Mejor fitness histórico
-    best_kpi_rect = pygame.Rect(
-        birds_kpi_rect.right + PADDING,
-        header_rect.bottom + PADDING,
-        kpi_width,
-        kpi_height
-    )
-    draw_kpi(surface, best_kpi_rect, "Mejor Fitness Histórico", f"{best_fitness:.1f}")
-
-    # KPI: Mejor fitness generación actual
-    gen_best_kpi_rect = pygame.Rect(
-        best_kpi_rect.right + PADDING,
-        header_rect.bottom + PADDING,
-        kpi_width,
-        kpi_height
-    )
+#    Etiqueta, valor y color de cada KPI, en el orden en que aparecen en el panel
+def stats_kpis():
 
     # Color condicional según si supera el récord histórico
     gen_best = generation_best_fitness
     best_color = SUCCESS_COLOR if gen_best >= best_fitness else HIGHLIGHT_COLOR
-    draw_kpi(surface, gen_best_kpi_rect, "Mejor Fitness Actual", f"{gen_best:.1f}", best_color)
 
+    # Durante una generación con varios cursos el valor es el de un solo carril, sin combinar
+    if generation_best_per_course:
+        gen_best_value = (f"{gen_best:.1f}", "por curso")
+    else:
+        gen_best_value = f"{gen_best:.1f}"
 
-#    Dibuja el juego principal en grande en el centro
-def draw_main_game(surface, game):
+    speed = (speed_control.label(), f"{speed_control.steps_per_second:.0f} pasos/s")
+
+    return [
+        ("Generación Actual", generation, LARGE_FONT_COLOR_KPI_VALUE_DEFAULT),
+        ("Birds Vivos", birds_alive, SUCCESS_COLOR),
+        ("Mejor Fitness Histórico", f"{best_fitness:.1f}", LARGE_FONT_COLOR_KPI_VALUE_DEFAULT),
+        ("Mejor Fitness Actual", gen_best_value, best_color),
+        ("Velocidad", speed, ACCENT_COLOR),
+    ]
+
+
+#     Dibuja el marco del panel de estadísticas global en la parte superior
+def draw_stats_panel(surface):
+
+    stats_panel, header_rect, kpi_rects = stats_panel_layout()
+    draw_panel(surface, stats_panel)
+    draw_header(surface, header_rect, "ESTADÍSTICAS DE ENTRENAMIENTO")
+
+    for rect, (label, value, value_color) in zip(kpi_rects, stats_kpis()):
+        draw_kpi_frame(surface, rect, label)
+
+
+#    Redibuja los valores de los KPIs que cambiaron
+def update_stats_panel(surface, dirty):
+
+    stats_panel, header_rect, kpi_rects = stats_panel_layout()
+    for rect, (label, value, value_color) in zip(kpi_rects, stats_kpis()):
+        refresh_region(surface, dirty, rect, (str(value), value_color),
+                       lambda: draw_kpi_value(surface, rect, value, value_color))
+
+
+#    Rectángulos del juego principal: panel, encabezado y vista del juego
+def main_game_layout():
 
     main_game_x = (SCREEN_WIDTH - MAIN_GAME_WIDTH) // 2
     main_game_y = STATS_PANEL_HEIGHT + MARGIN * 2
     main_game_rect = pygame.Rect(main_game_x, main_game_y, MAIN_GAME_WIDTH, MAIN_GAME_HEIGHT)
-    draw_panel(surface, main_game_rect)
 
     header_rect = pygame.Rect(main_game_rect.left, main_game_rect.top, main_game_rect.width, 40)
-    draw_header(surface, header_rect, "Mejor Bird en Acción")
 
-    game_view_rect = (
+    game_view_rect = pygame.Rect(
         main_game_rect.left + PADDING,
         header_rect.bottom + PADDING,
         main_game_rect.width - PADDING * 2,
         main_game_rect.height - header_rect.height - PADDING * 2
     )
-    game.draw(surface, game_view_rect)
+
+    return main_game_rect, header_rect, game_view_rect
+
+
+#    Dibuja el marco del juego principal
+def draw_main_game_frame(surface):
+
+    main_game_rect, header_rect, game_view_rect = main_game_layout()
+    draw_panel(surface, main_game_rect)
+    draw_header(surface, header_rect, "Mejor Bird en Acción")
+
+
+#    Dibuja el juego principal y su marcador dentro de la vista
+def draw_main_game_view(surface, game, flock=None):
+
+    main_game_rect, header_rect, game_view_rect = main_game_layout()
+    draw_game_view(surface, game, game_view_rect, flock)
 
     score_box = pygame.Rect(main_game_rect.left + PADDING, main_game_rect.bottom - 60, 120, 40)
     draw_panel(surface, score_box, ACCENT_COLOR, border=False, border_radius=20)
-    score_text = TITLE_FONT.render(f"Score: {game.score}", True, TITLE_FONT_COLOR_MAIN_GAME_SCORE)
+    score_text = assets.render_text(TITLE_FONT, f"Score: {game.score}", TITLE_FONT_COLOR_MAIN_GAME_SCORE)
     surface.blit(score_text, (
         score_box.left + (score_box.width - score_text.get_width()) // 2,
         score_box.top + (score_box.height - score_text.get_height()) // 2
     ))
 
 
-#    Dibuja los mini-juegos de la columna izquierda (birds 1-9)
-def draw_left_mini_games(surface, games):
+#    Dibuja el juego principal en grande en el centro
+def draw_main_game(surface, game):
+
+    draw_main_game_frame(surface)
+    draw_main_game_view(surface, game)
+
+
+#    Redibuja el juego principal; el marco solo se restaura si antes había un mensaje encima
+def update_main_game(surface, dirty, game):
+
+    main_game_rect, header_rect, game_view_rect = main_game_layout()
+    refresh_region(surface, dirty, main_game_rect, "juego", lambda: None)
 
-    if len(games) <= 1: return
+    draw_main_game_view(surface, game, overlay_flock if overlay_mode else None)
+    dirty.append(game_view_rect)
+
+
+#    Rectángulos de una columna de mini-juegos: columna, encabezado y, para cada una
+#    de las nueve celdas, (celda, vista del juego, etiqueta)
+def mini_games_layout(column_x):
 
     column_width = SCREEN_WIDTH // 4
-    column_x = MARGIN
     column_y = STATS_PANEL_HEIGHT + MARGIN * 2
     column_rect = pygame.Rect(column_x, column_y, column_width - MARGIN, MAIN_GAME_HEIGHT)
-    draw_panel(surface, column_rect)
     header_rect = pygame.Rect(column_rect.left, column_rect.top, column_rect.width, 40)
-    draw_header(surface, header_rect, "Birds 1-9")
 
     mini_width = (column_rect.width - PADDING * 4) // 3
     mini_height = (column_rect.height - header_rect.height - PADDING * 4) // 3
 
-    for i in range(1, min(10, len(games))):
+    cells = []
+    for cell in range(9):
 
-        col = (i - 1) % 3
-        row = (i - 1) // 3
+        col = cell % 3
+        row = cell // 3
         x = column_rect.left + PADDING + col * (mini_width + PADDING)
         y = header_rect.bottom + PADDING + row * (mini_height + PADDING)
-        cell_rect = pygame.Rect(x, y, mini_width, mini_height)
-        draw_panel(surface, cell_rect, pygame.Color(5, 5, 5), border_radius=4)  # Fondo de celda mini-juego
-        game_view = (x + 2, y + 2, mini_width - 4, mini_height - 22)
-        games[i].draw(surface, game_view)
-        label_rect = pygame.Rect(x, y + mini_height - 20, mini_width, 20)
-        pygame.draw.rect(surface, HIGHLIGHT_COLOR, label_rect, border_radius=4)  # Fondo de etiqueta
-        bird_text = SMALL_FONT.render(f"Bird #{i} | Score: {games[i].score}", True, SMALL_FONT_COLOR_MINI_GAME_LABEL)
-        text_x_pos = x + (mini_width - bird_text.get_width()) // 2
-        surface.blit(bird_text, (text_x_pos, y + mini_height - 18))
+        cells.append((
+            pygame.Rect(x, y, mini_width, mini_height),
+            pygame.Rect(x + 2, y + 2, mini_width - 4, mini_height - 22),
+            pygame.Rect(x, y + mini_height - 20, mini_width, 20)
+        ))
 
+    return column_rect, header_rect, cells
 
-#    Dibuja los mini-juegos de la columna derecha (birds 10-18)
-def draw_right_mini_games(surface, games):
 
-    if len(games) <= 10: return
+#    Dibuja el marco de una columna de mini-juegos, con las celdas vacías
+def draw_mini_games_frame(surface, column_x, title, cell_color):
 
-    column_width = SCREEN_WIDTH // 4
-    column_x = SCREEN_WIDTH - column_width
-    column_y = STATS_PANEL_HEIGHT + MARGIN * 2
-    column_rect = pygame.Rect(column_x, column_y, column_width - MARGIN, MAIN_GAME_HEIGHT)
+    column_rect, header_rect, cells = mini_games_layout(column_x)
     draw_panel(surface, column_rect)
-    header_rect = pygame.Rect(column_rect.left, column_rect.top, column_rect.width, 40)
-    draw_header(surface, header_rect, "Birds 10-18")
+    draw_header(surface, header_rect, title)
 
-    mini_width = (column_rect.width - PADDING * 4) // 3
-    mini_height = (column_rect.height - header_rect.height - PADDING * 4) // 3
+    for cell_rect, game_view, label_rect in cells:
+        draw_panel(surface, cell_rect, cell_color, border_radius=4)  # Fondo de celda mini-juego
+        pygame.draw.rect(surface, HIGHLIGHT_COLOR, label_rect, border_radius=4)  # Fondo de etiqueta
 
-    for i in range(10, min(19, len(games))):
 
-        col = (i - 10) % 3
-        row = (i - 10) // 3
-        x = column_rect.left + PADDING + col * (mini_width + PADDING)
-        y = header_rect.bottom + PADDING + row * (mini_height + PADDING)
-        cell_rect = pygame.Rect(x, y, mini_width, mini_height)
-        draw_panel(surface, cell_rect, pygame.Color(2, 2, 2), border_radius=4)  # Fondo de celda mini-juego
-        game_view = (x + 2, y + 2, mini_width - 4, mini_height - 22)
-        games[i].draw(surface, game_view)
-        label_rect = pygame.Rect(x, y + mini_height - 20, mini_width, 20)
-        pygame.draw.rect(surface, HIGHLIGHT_COLOR, label_rect, border_radius=4)  # Fondo de etiqueta
-        bird_text = SMALL_FONT.render(f"Bird #{i} | Score: {games[i].score}", True, SMALL_FONT_COLOR_MINI_GAME_LABEL)
-        text_x_pos = x + (mini_width - bird_text.get_width()) // 2
-        surface.blit(bird_text, (text_x_pos, y + mini_height - 18))
+#    Redibuja los mini-juegos de las dos columnas (birds 1-18); las celdas sin juego se vacían
+def update_mini_games(surface, dirty, games):
+
+    views = []
+    for column_x, title, first, cell_color in MINI_GAME_COLUMNS:
+        column_rect, header_rect, cells = mini_games_layout(column_x)
+
+        for i, (cell_rect, game_view, label_rect) in enumerate(cells, first):
+
+            if i >= len(games):
+                refresh_region(surface, dirty, cell_rect, "vacía", lambda: None)
+                dashboard_state.pop(tuple(label_rect), None)
+                continue
+
+            dashboard_state[tuple(cell_rect)] = "juego"
+            views.append((games[i], game_view))
+
+            label = f"Bird #{i} | Score: {games[i].score}"
+            refresh_region(surface, dirty, label_rect, label,
+                           lambda: draw_mini_game_label(surface, label_rect, label))
+
+    # Cada miniatura se compone en su propia superficie y se pasan todas juntas a la ventana
+    surface.blits(compose_views(views), doreturn=False)
+    dirty.extend(view_rect for game, view_rect in views)
+
+
+#    Superficie fuera de pantalla de una vista, creada una sola vez y reutilizada
+def view_surface(view_rect):
+
+    key = tuple(view_rect)
+    view_surf = view_surfaces.get(key)
+    if view_surf is None:
+        view_surf = pygame.Surface(view_rect.size).convert()
+        view_surfaces[key] = view_surf
+
+    return view_surf
+
+
+#    Dibuja un juego en la superficie de su vista y devuelve (superficie, posición) para blits
+def compose_view(game, view_rect, view_surf):
+
+    game.draw(view_surf, view_surf.get_rect())
+    return view_surf, view_rect.topleft
+
+
+#    Compone una tanda de vistas (juego, rectángulo, superficie)
+def compose_batch(jobs):
+
+    return [compose_view(game, view_rect, view_surf) for game, view_rect, view_surf in jobs]
+
+
+#    Compone las vistas (juego, rectángulo) en sus superficies y devuelve la lista para blits.
+#    Con render_pool se reparten en una tanda por hilo: el escalado y los blits de PyGame
+#    liberan el GIL, y repartir por tandas evita un cambio de hilo por miniatura
+def compose_views(views):
+
+    jobs = [(game, view_rect, view_surface(view_rect)) for game, view_rect in views]
+    if render_pool is None or len(jobs) < 2:
+        return compose_batch(jobs)
+
+    batches = [jobs[i::render_threads] for i in range(render_threads)]
+    composed = [None] * len(jobs)
+    for i, batch_composed in enumerate(render_pool.map(compose_batch, batches)):
+        composed[i::render_threads] = batch_composed
+    return composed
+
+
+#    Dibuja la etiqueta de un mini-juego sobre su fondo
+def draw_mini_game_label(surface, label_rect, label):
+
+    bird_text = assets.render_text(SMALL_FONT, label, SMALL_FONT_COLOR_MINI_GAME_LABEL)
+    text_x_pos = label_rect.left + (label_rect.width - bird_text.get_width()) // 2
+    surface.blit(bird_text, (text_x_pos, label_rect.top + 2))
 
 
 #    Dibuja el panel de información de la red neuronal en la parte inferior izquierda
@@ -356,34 +593,85 @@ def draw_network_info(surface):
         row_idx = i if i < 5 else i - 5
         x = info_panel.left + PADDING + col * (col_width + PADDING)
         y = title_rect.bottom + PADDING + row_idx * 28
-        label_surf = NORMAL_FONT.render(label, True, NORMAL_FONT_COLOR_NETWORK_INFO_LABEL)
+        label_surf = assets.render_text(NORMAL_FONT, label, NORMAL_FONT_COLOR_NETWORK_INFO_LABEL)
         surface.blit(label_surf, (x, y))
         if value:
-            value_surf = NORMAL_FONT.render(value, True, NORMAL_FONT_COLOR_NETWORK_INFO_VALUE)
+            value_surf = assets.render_text(NORMAL_FONT, value, NORMAL_FONT_COLOR_NETWORK_INFO_VALUE)
             value_x = x + 160
             surface.blit(value_surf, (value_x, y))
 
 
-#    Dibuja el gráfico de fitness histórico en la parte inferior derecha
-def draw_fitness_graph(surface):
+#    Rectángulos del gráfico de fitness: panel, encabezado y zona de la imagen
+def fitness_graph_layout():
 
     panel_width = SCREEN_WIDTH // 2 - MARGIN * 1.5
     panel_x = SCREEN_WIDTH // 2 + MARGIN // 2
     panel_y = STATS_PANEL_HEIGHT + MAIN_GAME_HEIGHT + MARGIN * 3
     graph_panel = pygame.Rect(panel_x, panel_y, panel_width, BOTTOM_PANEL_HEIGHT)
-    draw_panel(surface, graph_panel)
     title_rect = pygame.Rect(graph_panel.left, graph_panel.top, graph_panel.width, 40)
+    graph_rect = pygame.Rect(
+        graph_panel.left + PADDING,
+        title_rect.bottom + PADDING,
+        graph_panel.width - PADDING * 2,
+        graph_panel.height - title_rect.height - PADDING * 2
+    )
+
+    return graph_panel, title_rect, graph_rect
+
+
+#    Dibuja el marco del gráfico de fitness histórico en la parte inferior derecha
+def draw_fitness_graph_frame(surface):
+
+    graph_panel, title_rect, graph_rect = fitness_graph_layout()
+    draw_panel(surface, graph_panel)
     draw_header(surface, title_rect, "Histórico de Fitness")
 
+
+#    Dibuja el gráfico de fitness dentro de su marco.
+#    La imagen del gráfico solo se vuelve a generar cuando cambian los datos.
+def draw_fitness_graph(surface):
+
+    global fitness_graph_cache
+
+    graph_panel, title_rect, graph_rect = fitness_graph_layout()
+
     if not generation_fitnesses:
-        msg_surf = TITLE_FONT.render("No hay datos de fitness disponibles", True, TITLE_FONT_COLOR_GRAPH_NO_DATA)
+        msg_surf = assets.render_text(TITLE_FONT, "No hay datos de fitness disponibles", TITLE_FONT_COLOR_GRAPH_NO_DATA)
         msg_x = graph_panel.left + (graph_panel.width - msg_surf.get_width()) // 2
         msg_y = graph_panel.top + (graph_panel.height - msg_surf.get_height()) // 2
         surface.blit(msg_surf, (msg_x, msg_y))
         return
 
-    fig_width = (graph_panel.width - PADDING * 2) / 100
-    fig_height = (graph_panel.height - title_rect.height - PADDING * 2) / 100
+    key = fitness_graph_key(graph_rect.size)
+    if fitness_graph_cache is None or fitness_graph_cache[0] != key:
+        render = render_fitness_graph_pygame if fitness_graph_backend == "pygame" else render_fitness_graph_mpl
+        fitness_graph_cache = (key, render(graph_rect.size, generation_fitnesses))
+
+    surface.blit(fitness_graph_cache[1], graph_rect)
+
+
+#    Identifica los datos del gráfico: solo cambia cuando termina una generación
+def fitness_graph_key(size):
+
+    if not generation_fitnesses:
+        return None
+
+    return fitness_graph_backend, tuple(size), len(generation_fitnesses), generation_fitnesses[-1]
+
+
+#    Redibuja el gráfico de fitness solo si hay datos nuevos
+def update_fitness_graph(surface, dirty):
+
+    graph_panel, title_rect, graph_rect = fitness_graph_layout()
+    refresh_region(surface, dirty, graph_rect, fitness_graph_key(graph_rect.size),
+                   lambda: draw_fitness_graph(surface))
+
+
+#    Genera la imagen del gráfico de fitness con Matplotlib
+def render_fitness_graph_mpl(size, fitnesses):
+
+    fig_width = size[0] / 100
+    fig_height = size[1] / 100
 
     # Colores para Matplotlib (0-1 range)
     plot_line_color_mpl = tuple(c / 255 for c in HIGHLIGHT_COLOR)
@@ -396,12 +684,12 @@ def draw_fitness_graph(surface):
     fig = plt.figure(figsize=(fig_width, fig_height), dpi=100, facecolor=plot_bg_color_mpl)  # Usar color de fondo
     ax = fig.add_subplot(111, facecolor=plot_bg_color_mpl)  # Usar color de fondo para el área del plot
 
-    ax.plot(range(1, len(generation_fitnesses) + 1), generation_fitnesses, color=plot_line_color_mpl, marker='o',
+    ax.plot(range(1, len(fitnesses) + 1), fitnesses, color=plot_line_color_mpl, marker='o',
             markersize=4, linewidth=2)
-    if len(generation_fitnesses) > 1:
-        z = np.polyfit(range(1, len(generation_fitnesses) + 1), generation_fitnesses, 1)
+    if len(fitnesses) > 1:
+        z = np.polyfit(range(1, len(fitnesses) + 1), fitnesses, 1)
         p = np.poly1d(z)
-        trend_x = np.array(range(1, len(generation_fitnesses) + 1))
+        trend_x = np.array(range(1, len(fitnesses) + 1))
         ax.plot(trend_x, p(trend_x), linestyle='--', color=plot_trend_color_mpl, alpha=0.7, linewidth=1.5)
 
     ax.set_xlabel('Generación', fontsize=9, color=plot_text_color_mpl)
@@ -415,11 +703,11 @@ def draw_fitness_graph(surface):
     ax.spines['bottom'].set_color(plot_text_color_mpl)
     ax.spines['left'].set_color(plot_text_color_mpl)
 
-    max_fitness_val = max(generation_fitnesses) if generation_fitnesses else 10
+    max_fitness_val = max(fitnesses) if fitnesses else 10
     ax.set_ylim(0, max(10, max_fitness_val * 1.2))
 
-    if len(generation_fitnesses) >= 5:
-        last_5_avg = sum(generation_fitnesses[-5:]) / 5
+    if len(fitnesses) >= 5:
+        last_5_avg = sum(fitnesses[-5:]) / 5
         ax.axhline(y=last_5_avg, color=plot_avg_line_color_mpl, linestyle='--', alpha=0.5)
         ax.text(
             0.05, 0.92, f"Prom. 5 Gen: {last_5_avg:.1f}", transform=ax.transAxes,
@@ -432,10 +720,83 @@ def draw_fitness_graph(surface):
     renderer = canvas.get_renderer()
     raw_data = renderer.buffer_rgba()
     size = canvas.get_width_height()
-    surf = pygame.image.frombuffer(raw_data, size, "RGBA")
-    surface.blit(surf, (graph_panel.left + PADDING, title_rect.bottom + PADDING))
+    surf = pygame.image.frombuffer(raw_data, size, "RGBA").convert()  # Copia opaca: el buffer se libera con la figura
     plt.close(fig)
 
+    return surf
+
+
+#    Dibuja una línea discontinua entre dos puntos
+def draw_dashed_line(surface, color, start, end, dash=6, width=1):
+
+    length = max(abs(end[0] - start[0]), abs(end[1] - start[1]))
+    for i in range(0, int(length), dash * 2):
+        a = i / length
+        b = min(i + dash, length) / length
+        pygame.draw.line(surface, color,
+                         (start[0] + (end[0] - start[0]) * a, start[1] + (end[1] - start[1]) * a),
+                         (start[0] + (end[0] - start[0]) * b, start[1] + (end[1] - start[1]) * b), width)
+
+
+#    Genera la imagen del gráfico de fitness solo con PyGame, sin pasar por Matplotlib
+def render_fitness_graph_pygame(size, fitnesses):
+
+    surf = pygame.Surface(size)
+    surf.fill(PANEL_BG)
+
+    # Área del gráfico dentro de la imagen, dejando sitio para los ejes
+    plot = pygame.Rect(50, 10, size[0] - 60, size[1] - 45)
+    count = len(fitnesses)
+    y_max = max(10, max(fitnesses) * 1.2)
+    x_min, x_max = 0.5, count + 0.5
+
+    def to_screen(gen, value):
+        return (plot.left + (gen - x_min) / (x_max - x_min) * plot.width,
+                plot.bottom - value / y_max * plot.height)
+
+    # Rejilla horizontal con las marcas del eje Y
+    for i in range(6):
+        value = y_max * i / 5
+        y = to_screen(x_min, value)[1]
+        draw_dashed_line(surf, HIGHLIGHT_COLOR, (plot.left, y), (plot.right, y), dash=4)
+        label = assets.render_text(SMALL_FONT, f"{value:.0f}", NORMAL_FONT_COLOR_NETWORK_INFO_VALUE)
+        surf.blit(label, (plot.left - label.get_width() - 6, y - label.get_height() // 2))
+
+    # Marcas del eje X (como mucho 10)
+    for gen in range(1, count + 1, max(1, count // 10)):
+        x = to_screen(gen, 0)[0]
+        label = assets.render_text(SMALL_FONT, str(gen), NORMAL_FONT_COLOR_NETWORK_INFO_VALUE)
+        surf.blit(label, (x - label.get_width() // 2, plot.bottom + 4))
+
+    # Ejes
+    pygame.draw.line(surf, NORMAL_FONT_COLOR_NETWORK_INFO_VALUE, plot.bottomleft, plot.bottomright)
+    pygame.draw.line(surf, NORMAL_FONT_COLOR_NETWORK_INFO_VALUE, plot.topleft, plot.bottomleft)
+    x_label = assets.render_text(SMALL_FONT, "Generación", NORMAL_FONT_COLOR_NETWORK_INFO_VALUE)
+    surf.blit(x_label, (plot.centerx - x_label.get_width() // 2, size[1] - x_label.get_height()))
+
+    # Promedio de las últimas 5 generaciones
+    if count >= 5:
+        last_5_avg = sum(fitnesses[-5:]) / 5
+        y = to_screen(x_min, last_5_avg)[1]
+        draw_dashed_line(surf, (39, 174, 96), (plot.left, y), (plot.right, y))
+        avg_label = assets.render_text(SMALL_FONT, f"Prom. 5 Gen: {last_5_avg:.1f}", NORMAL_FONT_COLOR_NETWORK_INFO_VALUE)
+        surf.blit(avg_label, (plot.left + 8, plot.top + 4))
+
+    # Tendencia lineal y serie de fitness, recortadas al área del gráfico
+    surf.set_clip(plot)
+    if count > 1:
+        slope, intercept = np.polyfit(range(1, count + 1), fitnesses, 1)
+        draw_dashed_line(surf, (231, 76, 60), to_screen(1, intercept + slope), to_screen(count, intercept + slope * count))
+
+    points = [to_screen(gen, value) for gen, value in enumerate(fitnesses, 1)]
+    if count > 1:
+        pygame.draw.lines(surf, HIGHLIGHT_COLOR, False, points, 2)
+    for point in points:
+        pygame.draw.circle(surf, HIGHLIGHT_COLOR, point, 4)
+    surf.set_clip(None)
+
+    return surf
+
 
 #    Dibuja un panel de mensaje cuando no hay juegos activos
 def draw_message_panel(surface, message, submessage=""):
@@ -445,18 +806,33 @@ def draw_message_panel(surface, message, submessage=""):
     message_panel_rect = pygame.Rect(main_game_x, main_game_y, MAIN_GAME_WIDTH, MAIN_GAME_HEIGHT)
     draw_panel(surface, message_panel_rect)
 
-    msg_surf = LARGE_FONT.render(message, True, LARGE_FONT_COLOR_MESSAGE_MAIN)
+    # submessage puede ser un texto o una tupla de líneas; el bloque se centra en el panel y
+    # se recorta a él, para no dejar restos fuera de la región que se redibuja
+    lines = (submessage,) if isinstance(submessage, str) else submessage
+    msg_surf = assets.render_text(LARGE_FONT, message, LARGE_FONT_COLOR_MESSAGE_MAIN)
+    sub_surfs = [assets.render_text(TITLE_FONT, line, TITLE_FONT_COLOR_MESSAGE_SUBTEXT) for line in lines if line]
+    block_height = msg_surf.get_height() + sum(PADDING // 2 + sub_surf.get_height() for sub_surf in sub_surfs)
+
+    surface.set_clip(message_panel_rect)
     msg_x = message_panel_rect.left + (message_panel_rect.width - msg_surf.get_width()) // 2
-    msg_y = message_panel_rect.top + (message_panel_rect.height - msg_surf.get_height()) // 2 - (
-        msg_surf.get_height() // 4 if submessage else 0)
+    msg_y = message_panel_rect.top + (message_panel_rect.height - block_height) // 2
     surface.blit(msg_surf, (msg_x, msg_y))
 
-    if submessage:
-
-        sub_surf = TITLE_FONT.render(submessage, True, TITLE_FONT_COLOR_MESSAGE_SUBTEXT)
+    sub_y = msg_y + msg_surf.get_height()
+    for sub_surf in sub_surfs:
         sub_x = message_panel_rect.left + (message_panel_rect.width - sub_surf.get_width()) // 2
-        sub_y = msg_y + msg_surf.get_height() + PADDING // 2
+        sub_y += PADDING // 2
         surface.blit(sub_surf, (sub_x, sub_y))
+        sub_y += sub_surf.get_height()
+    surface.set_clip(None)
+
+
+#    Muestra un mensaje en lugar del juego principal, si no es el que ya está en pantalla
+def update_message_panel(surface, dirty, message, submessage=""):
+
+    main_game_rect, header_rect, game_view_rect = main_game_layout()
+    refresh_region(surface, dirty, main_game_rect, (message, submessage),
+                   lambda: draw_message_panel(surface, message, submessage))
 
 
 
@@ -466,24 +842,61 @@ def draw_message_panel(surface, message, submessage=""):
 
 
 
-#    Dibuja toda la interfaz de usuario con los juegos y estadísticas
-def draw_interface(surface, games_list):
+#    Dibuja en la capa estática todo lo que no cambia entre frames
+def draw_static_layer(surface):
 
     surface.fill(BG_COLOR)
 
     draw_stats_panel(surface)
+    draw_main_game_frame(surface)
+    for column_x, title, first, cell_color in MINI_GAME_COLUMNS:
+        draw_mini_games_frame(surface, column_x, title, cell_color)
+    draw_network_info(surface)
+    draw_fitness_graph_frame(surface)
+
+
+#    Dibuja toda la interfaz de usuario con los juegos y estadísticas.
+#    Solo se redibujan y se envían a la pantalla las regiones que cambiaron.
+#    Con stats_only (modo turbo) solo se refrescan el panel de estadísticas y el aviso.
+def draw_interface(surface, games_list, stats_only=False,
+                   message=("Modo turbo", "Pulsa T para volver a dibujar los juegos")):
+
+    global static_layer, dashboard_full_update
 
-    if games_list:
-        draw_main_game(surface, games_list[0])
-        draw_left_mini_games(surface, games_list)
-        draw_right_mini_games(surface, games_list)
+    # El marco se dibuja una sola vez
+    if static_layer is None:
+        static_layer = pygame.Surface(surface.get_size()).convert()
+        draw_static_layer(static_layer)
+        dashboard_full_update = True
+
+    if dashboard_full_update:
+        surface.blit(static_layer, (0, 0))
+        dashboard_state.clear()
+
+    dirty = []
+    update_stats_panel(surface, dirty)
+
+    if stats_only:
+        update_message_panel(surface, dirty, *message)
+        update_mini_games(surface, dirty, [])
+    elif games_list:
+        update_main_game(surface, dirty, games_list[0])
+        update_mini_games(surface, dirty, games_list)
     else:
-        draw_message_panel(surface, "¡Todos los pájaros murieron!", "Pasando a la siguiente generación...")
-    draw_network_info(surface)
+        update_message_panel(surface, dirty, "¡Todos los pájaros murieron!", "Pasando a la siguiente generación...")
+        update_mini_games(surface, dirty, [])
 
-    draw_fitness_graph(surface)
+    update_fitness_graph(surface, dirty)
 
-    pygame.display.update()
+    if dashboard_full_update:
+        pygame.display.update()
+        dashboard_full_update = False
+    else:
+        pygame.display.update(dirty)
+
+    # La ventana ya tiene el frame completo aunque solo se hayan actualizado algunas regiones
+    if recorder is not None:
+        recorder.capture(surface)
 
 
 
@@ -493,94 +906,231 @@ def draw_interface(surface, games_list):
 
 
 
+#    Copia el estado de un carril del lote a un FlappyBird que solo se usa para dibujar.
+#    Las tuberías no se copian: el juego comparte el curso del lote. steps son los pasos
+#    simulados desde que se dibujó por última vez
+def sync_display_game(game_instance, batch, lane, steps=1):
+
+    bird = game_instance.bird
+    bird.y = float(batch.y[lane])
+    bird.vel = float(batch.vel[lane])
+    bird.tilt = float(batch.tilt[lane])
+    bird.tick_count = int(batch.tick_count[lane])
+    bird.height = float(batch.height[lane])
+
+    game_instance.score = int(batch.score[lane])
+    game_instance.active = bool(batch.alive[lane])
+
+    # Efectos visuales: nubes y suelo solo se cuentan y se ponen al día al dibujar
+    game_instance.renderer.update(steps)
+
+
+#    Asigna los juegos de pantalla a los primeros carriles vivos del lote
+#    y guarda la bandada completa para la vista superpuesta (solo los del primer curso)
+def show_batch(batch, display_games):
+
+    global overlay_flock, shown_course_frame
+
+    # Con MAX, N pasos por frame o uno de cada K se dibuja menos de una vez por paso
+    course = batch.first_course()
+    if shown_course_frame is not None and shown_course_frame[0] is course:
+        steps = course.frame - shown_course_frame[1]
+    else:
+        steps = course.frame
+    shown_course_frame = (course, course.frame)
+
+    alive_lanes = np.flatnonzero(batch.alive[:batch.course_size])
+    overlay_flock = (batch.x, batch.y[alive_lanes], batch.tilt[alive_lanes])
+    games[:] = display_games[:min(len(alive_lanes), DISPLAY_GAMES)]
+    for game_instance, lane in zip(games, alive_lanes):
+        sync_display_game(game_instance, batch, lane, steps)
+
+    # Los que no se muestran ahora siguen contando pasos, para volver sin desfase
+    for game_instance in display_games[len(games):]:
+        game_instance.renderer.update(steps)
+
+
+#    Cierra la ventana si el usuario lo pide y atiende los controles de velocidad:
+#    1 tiempo real, 2 N pasos por frame, 3 dibujar uno de cada K pasos, 4 máxima,
+#    T turbo (solo estadísticas), +/- duplica o divide entre dos N o K.
+#    O alterna la vista superpuesta de todos los pájaros en el juego principal.
+def handle_events():
+
+    global overlay_mode
+
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            exit()
+
+        # La ventana se volvió a mostrar: hay que enviarla completa
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            invalidate_dashboard()
+
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_1:
+                speed_control.set_mode(SpeedControl.REALTIME)
+            elif event.key == pygame.K_2:
+                speed_control.set_mode(SpeedControl.STEPS_PER_FRAME)
+            elif event.key == pygame.K_3:
+                speed_control.set_mode(SpeedControl.EVERY_KTH)
+            elif event.key == pygame.K_4:
+                speed_control.set_mode(SpeedControl.MAX)
+            elif event.key == pygame.K_t:
+                speed_control.toggle_turbo()
+            elif event.key == pygame.K_o:
+                overlay_mode = not overlay_mode
+            elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                speed_control.faster()
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                speed_control.slower()
+
+
 #    Evalúa cada genoma ejecutando el juego con la red neuronal controlando al pájaro.
+#    Todos los pájaros de la generación avanzan juntos en un FlappyBatch; solo los que
+#    se muestran en pantalla tienen un FlappyBird asociado para dibujarlos.
 def eval_genomes(genomes_list, config):
 
-    global generation, best_fitness, generation_fitnesses, all_time_best_genome
-    global games, generation_best_fitness 
+    global generation, games, generation_best_fitness, generation_best_per_course, birds_alive
+
+    games.clear()
+
+    generation += 1
+    generation_best_fitness = 0
+    generation_best_per_course = course_sampling.courses > 1
+
+    ge = [genome_obj for genome_id, genome_obj in genomes_list]
+
+    # Un único curso de tuberías por generación, compartido por todos los pájaros.
+    # Solo se simulan los genomas sin resultado guardado, y los repetidos una sola vez
+    course_seed = generation_course_seed()
+    cache = generation_fitness_cache()
+    keys, play_keys, play_genomes = cache.plan(ge, course_seed, episode_budget, course_sampling)
+
+    # Las redes de toda la generación se evalúan juntas en cada frame. Con varios cursos
+    # cada genoma tiene un carril por curso; en pantalla se ve el primer curso y solo se
+    # cuentan los pájaros vivos de ese curso
+    network = BatchNetwork(play_genomes, config, cache.fingerprints(play_keys))
+    batch = FlappyBatch(len(play_genomes) * course_sampling.courses, course_sampling.course(course_seed))
+    fitness = np.zeros(batch.size)
+    capped = np.zeros(batch.size, dtype=bool)
+    display_games = [FlappyBird(batch.first_course()) for _ in range(DISPLAY_GAMES)]
+    birds_alive = batch.course_size
+
+    # El ritmo de simulación y de dibujo lo decide el modo de velocidad actual
+    while batch.alive.any():
+
+        if speed_control.step_due():
+            step(batch, network, fitness)
+            capped |= episode_budget.enforce(batch)
+            speed_control.count_step()
+
+        if speed_control.render_due():
+            handle_events()
 
-    nets = []
-    # games = [] 
-    ge = []
+            generation_best_fitness = max(generation_best_fitness, float(fitness.max()))
+            birds_alive = int(batch.alive[:batch.course_size].sum())
 
-    games.clear() 
+            stats_only = not speed_control.render_games()
+            if not stats_only:
+                show_batch(batch, display_games)
+            draw_interface(WINDOW, games, stats_only)  # Pasar la lista global 'games'
+        else:
+            speed_control.wait()
+
+    # Solo los genomas simulados en esta generación cuentan para el presupuesto
+    fitness = course_sampling.aggregate_fitness(fitness)
+    capped = course_sampling.aggregate_capped(capped)
+    budget_reporter.record(capped)
+    fitness, capped = cache.complete(keys, play_keys, fitness, capped)
+    generation_best_fitness = float(fitness.max())
+    generation_best_per_course = False
+    finish_generation(genomes_list, fitness, cache)
+
+
+#    Evalúa la generación repartida entre los procesos del evaluador. Mientras tanto,
+#    los primeros genomas se juegan también aquí, sobre el mismo curso, para el dashboard.
+def eval_genomes_parallel(genomes_list, config, evaluator):
+
+    global generation, games, generation_best_fitness, generation_best_per_course, birds_alive
+
+    games.clear()
 
     generation += 1
     generation_best_fitness = 0
+    generation_best_per_course = course_sampling.courses > 1
 
-    for genome_id, genome_obj in genomes_list:
-        net = neat.nn.FeedForwardNetwork.create(genome_obj, config)
-        nets.append(net)
-        games.append(FlappyBird())
-        genome_obj.fitness = 0
-        ge.append(genome_obj)
+    ge = [genome_obj for genome_id, genome_obj in genomes_list]
+    course_seed = generation_course_seed()
+    cache = generation_fitness_cache()
+    keys, play_keys, play_genomes = cache.plan(ge, course_seed, episode_budget, course_sampling)
+    pending = evaluator.submit(play_genomes, course_seed, episode_budget, course_sampling)
 
-    run = True
-    clock = pygame.time.Clock()
+    # Muestra de pájaros que se dibujan en pantalla
+    sample = play_genomes[:DISPLAY_GAMES]
+    # Los procesos compilan también estos genomas; solo cuentan sus compilaciones en el
+    # reporter de la caché de redes
+    network = BatchNetwork(sample, config, cache.fingerprints(play_keys[:DISPLAY_GAMES]), counted=False)
+    batch = FlappyBatch(len(sample) * course_sampling.courses, course_sampling.course(course_seed))
+    sample_fitness = np.zeros(batch.size)
+    display_games = [FlappyBird(batch.first_course()) for _ in range(DISPLAY_GAMES)]
+    birds_alive = batch.course_size
 
-    active_indices = list(range(len(games)))
+    # La muestra sigue el modo de velocidad actual mientras los procesos terminan
+    while not pending.ready():
 
-    while run and len(games) > 0:
+        if batch.alive.any() and speed_control.step_due():
+            step(batch, network, sample_fitness)
+            episode_budget.enforce(batch)
+            speed_control.count_step()
+            generation_best_fitness = max(generation_best_fitness, float(sample_fitness.max()))
+            birds_alive = int(batch.alive[:batch.course_size].sum())
 
-        clock.tick(100)  # Ajustar FPS según sea necesario
+        if speed_control.render_due():
+            handle_events()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-                pygame.quit()
-                exit()
+            stats_only = not speed_control.render_games()
+            if not stats_only:
+                show_batch(batch, display_games)
+            draw_interface(WINDOW, games, stats_only)
+        elif batch.alive.any():
+            speed_control.wait()
+        else:
+            # Sin muestra que simular se espera a los procesos hasta el próximo dibujo
+            pending.wait(1 / DISPLAY_HZ)
+
+    # Solo los genomas simulados en esta generación cuentan para el presupuesto
+    fitness, capped = evaluator.gather(pending)
+    budget_reporter.record(capped)
+    fitness, capped = cache.complete(keys, play_keys, fitness, capped)
+    generation_best_fitness = float(fitness.max())
+    generation_best_per_course = False
+
+    finish_generation(genomes_list, fitness, cache)
 
-        for i_idx in range(len(games) - 1, -1, -1):
-
-            game_instance = games[i_idx]
-            genome_instance = ge[i_idx]
-            net_instance = nets[i_idx]
-
-            if not game_instance.pipes:
-                output = net_instance.activate((0.5, 0.5, 0.5, 0))  
-                if output[0] > 0.5:
-                    game_instance.bird.jump()
-                game_instance.update()
-                continue  
-
-            pipe_ind = 0
-            if len(game_instance.pipes) > 1 and game_instance.bird.x > game_instance.pipes[0].x + game_instance.pipes[
-                0].PIPE_TOP.get_width():
-                pipe_ind = 1
-
-            bird_y_norm = game_instance.bird.y / MAIN_GAME_HEIGHT
-            dist_to_top_pipe_norm = abs(game_instance.bird.y - game_instance.pipes[pipe_ind].height) / MAIN_GAME_HEIGHT
-            dist_to_bottom_pipe_norm = abs(
-                game_instance.bird.y - game_instance.pipes[pipe_ind].bottom) / MAIN_GAME_HEIGHT
-            bird_vel_norm = game_instance.bird.vel / 30  # Velocidad máxima
-
-            inputs = (
-                np.clip(bird_y_norm, 0, 1),
-                np.clip(dist_to_top_pipe_norm, 0, 1),
-                np.clip(dist_to_bottom_pipe_norm, 0, 1),
-                np.clip(bird_vel_norm, -1, 1)
-            )
-
-            output = net_instance.activate(inputs)
-            if output[0] > 0.5:
-                game_instance.bird.jump()
-
-            result = game_instance.update()
-            
-            genome_instance.fitness += 0.5  # Recompensa por seguir vivo
-            if game_instance.score > (
-                    genome_instance.fitness - 0.1 * game_instance.bird.tick_count) / 5:  # Ajustar para que el score sea el factor principal
-                genome_instance.fitness = game_instance.score * 5
 
-            if genome_instance.fitness > generation_best_fitness:
-                generation_best_fitness = genome_instance.fitness
+#    Semilla del curso de una generación: la de --course-seed o la siguiente de run_seeds
+def generation_course_seed():
 
-            if result == "dead":
-                nets.pop(i_idx)
-                ge.pop(i_idx)
-                games.pop(i_idx)
+    if fixed_course_seed is not None:
+        return fixed_course_seed
+    return run_seeds.course_seed()
 
-        draw_interface(WINDOW, games)  # Pasar la lista global 'games'
+
+#    Caché de fitness de una generación: la persistente de --fitness-cache o, sin ella, una
+#    nueva que solo evita simular dos veces los genomas repetidos
+def generation_fitness_cache():
+
+    return fitness_cache if fitness_cache is not None else FitnessCache()
+
+
+#    Asigna el fitness a los genomas y actualiza las estadísticas globales
+def finish_generation(genomes_list, fitness, cache):
+
+    global best_fitness, generation_fitnesses, all_time_best_genome
+
+    for (genome_id, genome_obj), genome_fitness in zip(genomes_list, fitness):
+        genome_obj.fitness = float(genome_fitness)
 
     # Después de la generación
     if generation_best_fitness > best_fitness:
@@ -602,12 +1152,20 @@ def eval_genomes(genomes_list, config):
 
     generation_fitnesses.append(generation_best_fitness)
 
+    if cache.reused or cache.duplicates:
+        print(f"Fitness: {cache.label()}")
+
+    if recorder is not None:
+        print(f"Grabación: {recorder.label()}")
+
 
 #    Ejecuta el algoritmo NEAT con el archivo de configuración dado.
-def run_neat(config_path):
+#    Con workers > 0 la evaluación se reparte entre ese número de procesos.
+def run_neat(config_path, workers=0):
 
     global all_time_best_genome  
 
+    init_display()
     config = neat.config.Config(
         neat.DefaultGenome,
         neat.DefaultReproduction,
@@ -615,12 +1173,32 @@ def run_neat(config_path):
         neat.DefaultStagnation,
         config_path
     )
+    # NEAT usa el módulo random global; los cursos y los detalles cosméticos tienen sus propios flujos
+    print(f"Semilla de la ejecución: {run_seeds.seed} (repetir con --seed {run_seeds.seed})")
+    random.seed(run_seeds.neat_seed)
+    seed_cosmetics(run_seeds.cosmetic_seed)
+
     p = neat.Population(config)
     p.add_reporter(neat.StdOutReporter(True))
     stats = neat.StatisticsReporter()
     p.add_reporter(stats)
+    p.add_reporter(budget_reporter)
+    p.add_reporter(CompileCacheReporter())
 
-    winner = p.run(eval_genomes, 100)    #    ----------    20 generaciones    ----------
+    try:
+        if workers > 0:
+            # La muestra en pantalla se sigue mejor a tiempo real
+            speed_control.set_mode(SpeedControl.REALTIME)
+            evaluator = ParallelEvaluator(workers, config)
+            try:
+                winner = p.run(functools.partial(eval_genomes_parallel, evaluator=evaluator), 100)
+            finally:
+                evaluator.close()
+        else:
+            winner = p.run(eval_genomes, 100)    #    ----------    20 generaciones    ----------
+    finally:
+        if fitness_cache is not None:
+            fitness_cache.save()
 
     print('\nMejor genoma encontrado por NEAT:\n{!s}'.format(winner))
     with open("winner_genome.pickle", "wb") as f:  # Guardar el ganador final de NEAT
@@ -632,8 +1210,83 @@ def run_neat(config_path):
         plot_stats(stats, ylog=False, view=True, filename="fitness_history.svg")
 
 
+#    Evoluciona varias poblaciones en paralelo con el modelo de islas (ver islands.py).
+#    El dashboard muestra las estadísticas agregadas: la generación más avanzada, el mejor
+#    fitness de todas las islas y, en el panel central, el estado de cada isla.
+def run_islands(config_path, islands, overrides=(), interval=MIGRATION_INTERVAL, migrants=MIGRANTS):
+
+    global generation, best_fitness, generation_best_fitness, all_time_best_genome, birds_alive
+
+    init_display()
+    model = IslandModel(config_path, islands, overrides, run_seeds.seed, 100, episode_budget,
+                        interval, migrants, course_sampling)
+    print(f"Modelo de islas: {islands} poblaciones, migración de {migrants} genomas "
+          f"cada {interval} generaciones (semilla {run_seeds.seed})")
+
+    # Último estado de cada isla y mejor fitness de cada generación según van llegando
+    island_status = {}
+    generation_bests = {}
+    winner = None
+    birds_alive = 0
+
+    try:
+        # running() se consulta antes de leer los mensajes, para no perder los últimos que
+        # enviaron las islas antes de terminar
+        running = True
+        while running:
+            running = model.running()
+            for message in model.poll():
+                if message[0] == "done":
+                    index, island_best, solved = message[1:]
+                    if island_best is not None and (winner is None or island_best.fitness > winner.fitness):
+                        winner = island_best
+                    if solved:
+                        print(f"La isla {index + 1} alcanzó el fitness objetivo")
+                        model.stop()
+                    continue
+
+                index, island_generation, island_fitness, mean, species_count, island_best = message[1:]
+                island_status[index] = (island_generation, island_fitness, species_count)
+                print(f"Isla {index + 1} | gen {island_generation} | mejor {island_fitness:.1f} | "
+                      f"media {mean:.1f} | {species_count} especies")
+
+                generation = max(generation, island_generation + 1)
+                generation_best_fitness = max(generation_best_fitness, island_fitness)
+                generation_bests.setdefault(island_generation, []).append(island_fitness)
+                if len(generation_bests[island_generation]) == islands:
+                    generation_fitnesses.append(max(generation_bests.pop(island_generation)))
+
+                if island_fitness > best_fitness:
+                    best_fitness = island_fitness
+                    all_time_best_genome = island_best
+                    with open("best_genome.pickle", "wb") as f:
+                        pickle.dump(all_time_best_genome, f)
+
+            handle_events()
+            # Una línea por isla en el panel del juego principal
+            summary = tuple(f"Isla {index + 1}: gen {status[0]}, {status[1]:.1f}, {status[2]} esp."
+                            for index, status in sorted(island_status.items()))
+            draw_interface(WINDOW, [], True, (f"Modo islas: {islands} poblaciones", summary))
+            time.sleep(1 / DISPLAY_HZ)
+    finally:
+        model.close()
+
+    if winner is None:
+        return
+
+    print('\nMejor genoma de todas las islas:\n{!s}'.format(winner))
+    with open("winner_genome.pickle", "wb") as f:
+        pickle.dump(winner, f)
+
+    if 'draw_net' in globals() and callable(draw_net):
+        config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                    neat.DefaultSpeciesSet, neat.DefaultStagnation, config_path)
+        draw_net(config, winner, True, filename="winner_network.svg")
+
+
 #    Ejecuta el genoma ganador en el juego para mostrar su rendimiento.
 def run_winner(config_path, genome_path="winner_genome.pickle"):
+    init_display()
     config = neat.config.Config(
         neat.DefaultGenome, neat.DefaultReproduction,
         neat.DefaultSpeciesSet, neat.DefaultStagnation, config_path
@@ -670,10 +1323,7 @@ def run_winner(config_path, genome_path="winner_genome.pickle"):
             pygame.display.update()
             continue
 
-        pipe_ind = 0
-        if len(game_instance.pipes) > 1 and game_instance.bird.x > game_instance.pipes[0].x + game_instance.pipes[
-            0].PIPE_TOP.get_width():
-            pipe_ind = 1
+        pipe_ind = game_instance.course.next_pipe_index()
 
         bird_y_norm = game_instance.bird.y / MAIN_GAME_HEIGHT
         dist_to_top_pipe_norm = abs(game_instance.bird.y - game_instance.pipes[pipe_ind].height) / MAIN_GAME_HEIGHT
@@ -699,7 +1349,7 @@ def run_winner(config_path, genome_path="winner_genome.pickle"):
             break
             
         WINDOW.fill(BG_COLOR)
-        winner_text_surf = TITLE_FONT.render("DEMO DEL GANADOR", True, SUCCESS_COLOR)
+        winner_text_surf = assets.render_text(TITLE_FONT, "DEMO DEL GANADOR", SUCCESS_COLOR)
         WINDOW.blit(winner_text_surf,
                     (SCREEN_WIDTH // 2 - winner_text_surf.get_width() // 2, MARGIN + STATS_PANEL_HEIGHT - 60))
 
@@ -711,8 +1361,70 @@ def run_winner(config_path, genome_path="winner_genome.pickle"):
 
 
 
+#    Valida --aggregate al leer los argumentos: mean, min o un percentil de 0 a 100
+def aggregate_argument(text):
+
+    try:
+        CourseSampling(aggregate=text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{text}' no es mean, min ni un percentil de 0 a 100")
+    return text
+
+
+
+
 #    Punto de entrada principal para ejecutar el entrenamiento NEAT y la demostración del ganador.
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entrenamiento NEAT de Flappy Bird")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Procesos para evaluar cada generación (0 = un solo proceso)")
+    parser.add_argument("--graph", choices=("matplotlib", "pygame"), default="matplotlib",
+                        help="Cómo se dibuja el gráfico de fitness (pygame no usa Matplotlib)")
+    parser.add_argument("--render-threads", type=int, default=0,
+                        help="Hilos para componer las miniaturas del dashboard (0 = en el hilo principal)")
+    parser.add_argument("--max-frames", type=int, default=MAX_FRAMES,
+                        help="Frames como máximo de cada generación (0 = sin límite)")
+    parser.add_argument("--max-score", type=int, default=0,
+                        help="Puntuación a la que se retira cada pájaro (0 = sin límite)")
+    parser.add_argument("--seed", type=int,
+                        help="Semilla raíz del entrenamiento, para repetirlo idéntico (por defecto una al azar)")
+    parser.add_argument("--course-seed", type=int,
+                        help="Juega todas las generaciones en el mismo curso (por defecto uno al azar en cada una)")
+    parser.add_argument("--fitness-cache", metavar="FICHERO",
+                        help="Reutiliza y guarda en FICHERO los fitness ya calculados (útil con --course-seed)")
+    parser.add_argument("--islands", type=int, default=0,
+                        help="Número de poblaciones del modelo de islas, cada una en su proceso (0 = una sola)")
+    parser.add_argument("--island-config", action="append", default=[], metavar="FICHERO",
+                        help="Valores de config.txt que cambian en una isla; se reparten en orden entre las islas")
+    parser.add_argument("--migration-interval", type=int, default=MIGRATION_INTERVAL, metavar="K",
+                        help="Generaciones entre migraciones del modelo de islas")
+    parser.add_argument("--migrants", type=int, default=MIGRANTS,
+                        help="Mejores genomas que envía cada isla a la siguiente al migrar")
+    parser.add_argument("--courses", type=int, default=1, metavar="K",
+                        help="Cursos en los que se puntúa cada genoma, jugados a la vez en el mismo lote")
+    parser.add_argument("--aggregate", type=aggregate_argument, default="mean",
+                        help="Cómo se combinan los K fitness: mean, min o un percentil de 0 a 100")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Graba el dashboard en DIR mientras se entrena")
+    parser.add_argument("--record-format", choices=FrameRecorder.FORMATS, default="png",
+                        help="Secuencia de PNG o RGB de 24 bits sin comprimir en un solo fichero")
+    parser.add_argument("--record-every", type=int, default=1, metavar="K",
+                        help="Guarda uno de cada K frames dibujados")
+    args = parser.parse_args()
+    fitness_graph_backend = args.graph
+    episode_budget = EpisodeBudget(args.max_frames or None, args.max_score or None)
+    run_seeds = RunSeeds(args.seed)
+    course_sampling = CourseSampling(args.courses, args.aggregate)
+    fixed_course_seed = args.course_seed
+    if args.fitness_cache:
+        fitness_cache = FitnessCache(args.fitness_cache)
+    render_threads = args.render_threads
+    if render_threads > 0:
+        render_pool = ThreadPoolExecutor(render_threads, thread_name_prefix="miniaturas")
+    init_display()
+    if args.record:
+        recorder = FrameRecorder(args.record, WINDOW.get_size(), args.record_format, args.record_every)
+
     local_dir = os.path.dirname(__file__)
     config_file_path = os.path.join(local_dir, "config.txt")
 
@@ -735,7 +1447,15 @@ if __name__ == "__main__":
         pygame.quit()
         exit()
 
-    run_neat(config_file_path)
+    try:
+        if args.islands > 0:
+            run_islands(config_file_path, args.islands, args.island_config,
+                        args.migration_interval, args.migrants)
+        else:
+            run_neat(config_file_path, workers=args.workers)
+    finally:
+        if recorder is not None:
+            recorder.close()
     # Preguntar al usuario si quiere ver la demo del ganador
     show_winner_demo = input("¿Ejecutar demostración del genoma ganador? (s/n): ")
     if show_winner_demo.lower() == 's':
@@ -0,0 +1,399 @@
+from collections import OrderedDict
+import warnings
+import numpy as np
+import neat
+
+
+
+
+# NumPy versions of the built-in NEAT activation functions, with the same clamping.
+def _sigmoid(z):
+
+    return 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0)))
+
+
+def _tanh(z):
+
+    return np.tanh(np.clip(2.5 * z, -60.0, 60.0))
+
+
+def _sin(z):
+
+    return np.sin(np.clip(5.0 * z, -60.0, 60.0))
+
+
+def _gauss(z):
+
+    return np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2)
+
+
+def _relu(z):
+
+    return np.maximum(z, 0.0)
+
+
+def _softplus(z):
+
+    return 0.2 * np.log(1 + np.exp(np.clip(5.0 * z, -60.0, 60.0)))
+
+
+def _identity(z):
+
+    return z
+
+
+def _clamped(z):
+
+    return np.clip(z, -1.0, 1.0)
+
+
+# 1 / z, and 0 where NEAT's version gives up (division by zero or overflow).
+def _inv(z):
+
+    with np.errstate(divide="ignore", over="ignore"):
+        inverse = 1.0 / z
+    return np.where(np.isfinite(inverse), inverse, 0.0)
+
+
+def _log(z):
+
+    return np.log(np.maximum(z, 1e-7))
+
+
+def _exp(z):
+
+    return np.exp(np.clip(z, -60.0, 60.0))
+
+
+def _hat(z):
+
+    return np.maximum(0.0, 1 - np.abs(z))
+
+
+def _square(z):
+
+    with np.errstate(over="ignore"):
+        return z ** 2
+
+
+def _cube(z):
+
+    with np.errstate(over="ignore"):
+        return z ** 3
+
+
+ACTIVATIONS = {
+    neat.activations.sigmoid_activation: _sigmoid,
+    neat.activations.tanh_activation: _tanh,
+    neat.activations.sin_activation: _sin,
+    neat.activations.gauss_activation: _gauss,
+    neat.activations.relu_activation: _relu,
+    neat.activations.softplus_activation: _softplus,
+    neat.activations.identity_activation: _identity,
+    neat.activations.clamped_activation: _clamped,
+    neat.activations.inv_activation: _inv,
+    neat.activations.log_activation: _log,
+    neat.activations.exp_activation: _exp,
+    neat.activations.abs_activation: np.abs,
+    neat.activations.hat_activation: _hat,
+    neat.activations.square_activation: _square,
+    neat.activations.cube_activation: _cube,
+}
+
+
+# NumPy versions of the built-in NEAT aggregations other than sum, which is a plain
+# product of the weight tensor. Each one reduces terms[..., source slot] over the
+# entries where linked is set, i.e. the node's incoming connections.
+def _product(terms, linked):
+
+    return np.prod(np.where(linked, terms, 1.0), axis=-1)
+
+
+def _max(terms, linked):
+
+    return np.max(np.where(linked, terms, -np.inf), axis=-1)
+
+
+def _min(terms, linked):
+
+    return np.min(np.where(linked, terms, np.inf), axis=-1)
+
+
+def _maxabs(terms, linked):
+
+    index = np.argmax(np.where(linked, np.abs(terms), -1.0), axis=-1)
+    return np.take_along_axis(terms, index[..., None], axis=-1)[..., 0]
+
+
+def _median(terms, linked):
+
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # padding nodes have no links
+        return np.nanmedian(np.where(linked, terms, np.nan), axis=-1)
+
+
+def _mean(terms, linked):
+
+    count = np.maximum(linked.sum(axis=-1), 1)
+    return np.where(linked, terms, 0.0).sum(axis=-1) / count
+
+
+AGGREGATIONS = {
+    neat.aggregations.product_aggregation: _product,
+    neat.aggregations.max_aggregation: _max,
+    neat.aggregations.min_aggregation: _min,
+    neat.aggregations.maxabs_aggregation: _maxabs,
+    neat.aggregations.median_aggregation: _median,
+    neat.aggregations.mean_aggregation: _mean,
+}
+
+
+
+
+# Structural and weight fingerprint of a genome: its node genes and enabled connection
+# genes in key order. Two genomes with the same fingerprint compile to the same network.
+def genome_fingerprint(genome):
+
+    nodes = tuple(sorted((key, node.bias, node.response, node.activation, node.aggregation)
+                         for key, node in genome.nodes.items()))
+    connections = tuple(sorted((key, connection.weight)
+                               for key, connection in genome.connections.items() if connection.enabled))
+    return nodes, connections
+
+
+
+
+# Compiled networks keyed by genome fingerprint. Elites and unchanged offspring are carried
+# over between generations, so their topological sort is only done once. Bounded: the least
+# recently used networks are dropped once capacity is reached.
+class CompileCache:
+
+
+# Initialize an empty cache.
+    def __init__(self, capacity=2048):
+
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+# Return the value slots, node depths and node evals of a genome, compiling it on a miss.
+# Callers that already have the genome's fingerprint pass it to avoid computing it again.
+# With counted=False the lookup is left out of the hit and miss counters.
+    def compile(self, genome, config, fixed_slots, input_keys, fingerprint=None, counted=True):
+
+        key = genome_fingerprint(genome) if fingerprint is None else fingerprint
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += counted
+            return entry
+
+        net = neat.nn.FeedForwardNetwork.create(genome, config)
+        net_slots = dict(fixed_slots)
+        net_depths = {input_key: 0 for input_key in input_keys}
+        for node, act_func, agg_func, bias, response, links in net.node_evals:
+            if node not in net_slots:
+                net_slots[node] = len(net_slots)
+            net_depths[node] = 1 + max((net_depths.get(i, 0) for i, w in links), default=0)
+
+        entry = net_slots, net_depths, net.node_evals
+        self.entries[key] = entry
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        self.misses += counted
+        return entry
+
+
+# Add hits and misses counted elsewhere, e.g. by the cache of a worker process.
+    def count(self, hits, misses):
+
+        self.hits += hits
+        self.misses += misses
+
+
+# Process-wide cache used by BatchNetwork.
+compile_cache = CompileCache()
+
+
+
+
+# NEAT reporter with the hit rate of the compile cache in each generation.
+class CompileCacheReporter(neat.reporting.BaseReporter):
+
+
+# Follow the given cache.
+    def __init__(self, cache=compile_cache):
+
+        self.cache = cache
+        self.start = (cache.hits, cache.misses)
+
+
+# Remember the counters at the start of the generation.
+    def start_generation(self, generation):
+
+        self.start = (self.cache.hits, self.cache.misses)
+
+
+# Print how many networks of the generation came from the cache.
+    def post_evaluate(self, config, population, species, best_genome):
+
+        hits = self.cache.hits - self.start[0]
+        misses = self.cache.misses - self.start[1]
+        if hits + misses:
+            print(f"Redes compiladas reutilizadas: {hits}/{hits + misses} ({hits / (hits + misses):.0%})")
+
+
+
+
+# Feed-forward networks of a whole population evaluated together with NumPy.
+# Every genome's nodes are mapped to value slots (inputs first, then outputs, then
+# hidden nodes) and grouped by topological depth. Each depth is one padded weight
+# tensor, so a forward pass is one batched product per depth for all birds at once.
+# Nodes may mix activations and aggregations: each one used at a depth is applied once
+# to that depth, through a mask of the nodes that use it. Genomes with a user-defined
+# function NumPy has no version of are evaluated one by one with FeedForwardNetwork.
+class BatchNetwork:
+
+
+# Compile the networks of the given genomes. fingerprints, if given, holds the
+# genome_fingerprint of each genome, e.g. from the keys of the fitness cache. counted=False
+# keeps the compiles out of the cache counters, for genomes also compiled somewhere else.
+    def __init__(self, genomes, config, fingerprints=None, counted=True):
+
+        genome_config = config.genome_config
+        self.input_keys = list(genome_config.input_keys)
+        self.output_keys = list(genome_config.output_keys)
+        self.size = len(genomes)
+
+        # Value slots, depth and evaluation order of every node, per genome
+        fixed_slots = {key: slot for slot, key in enumerate(self.input_keys + self.output_keys)}
+        fingerprints = [None] * len(genomes) if fingerprints is None else fingerprints
+        compiled = [compile_cache.compile(genome, config, fixed_slots, self.input_keys, fingerprint, counted)
+                    for genome, fingerprint in zip(genomes, fingerprints)]
+        slots = [net_slots for net_slots, net_depths, node_evals in compiled]
+        depths = [net_depths for net_slots, net_depths, node_evals in compiled]
+
+        self.slot_count = max(len(net_slots) for net_slots in slots) if slots else len(fixed_slots)
+        self.depth_count = max((max(net_depths.values()) for net_depths in depths), default=0)
+
+        # Fallback for functions without a NumPy version: the networks neat-python would use
+        self.networks = None
+        if any(act_func not in ACTIVATIONS
+               or (agg_func is not neat.aggregations.sum_aggregation and agg_func not in AGGREGATIONS)
+               for net_slots, net_depths, node_evals in compiled
+               for node, act_func, agg_func, bias, response, links in node_evals):
+            self.networks = [neat.nn.FeedForwardNetwork(self.input_keys, self.output_keys, node_evals)
+                             for net_slots, net_depths, node_evals in compiled]
+            return
+
+        # Nodes of every genome grouped by depth
+        levels = [[[] for _ in range(self.size)] for _ in range(self.depth_count)]
+        for index, (net_slots, net_depths, node_evals) in enumerate(compiled):
+            for node_eval in node_evals:
+                levels[depths[index][node_eval[0]] - 1][index].append(node_eval)
+
+        # One padded tensor per depth: weights[d][genome, node, source slot]. Padding
+        # entries target slot 0 and are masked out, so they never change any value.
+        # activations[d] and aggregations[d] pair each function used at the depth with
+        # the mask of its nodes (None: every node). Only depths with an aggregation other
+        # than sum keep linked[d], which marks the real connections among the zero weights.
+        self.weights = []
+        self.biases = []
+        self.responses = []
+        self.targets = []
+        self.valid = []
+        self.has_level = []
+        self.activations = []
+        self.aggregations = []
+        self.linked = []
+        for level in levels:
+            width = max(len(level_nodes) for level_nodes in level)
+            weights = np.zeros((self.size, width, self.slot_count))
+            biases = np.zeros((self.size, width))
+            responses = np.zeros((self.size, width))
+            targets = np.zeros((self.size, width), dtype=np.intp)
+            valid = np.zeros((self.size, width), dtype=bool)
+            act_masks = {}
+            agg_masks = {}
+            links_at = []
+
+            for index, level_nodes in enumerate(level):
+                net_slots = slots[index]
+                for position, (node, act_func, agg_func, bias, response, links) in enumerate(level_nodes):
+                    for i, w in links:
+                        weights[index, position, net_slots[i]] += w
+                        links_at.append((index, position, net_slots[i]))
+                    biases[index, position] = bias
+                    responses[index, position] = response
+                    targets[index, position] = net_slots[node]
+                    valid[index, position] = True
+                    act_masks.setdefault(act_func, []).append((index, position))
+                    if agg_func is not neat.aggregations.sum_aggregation:
+                        agg_masks.setdefault(agg_func, []).append((index, position))
+
+            self.weights.append(weights)
+            self.biases.append(biases)
+            self.responses.append(responses)
+            self.targets.append(targets)
+            self.valid.append(valid)
+            self.has_level.append(valid.any(axis=1))
+            self.activations.append([(ACTIVATIONS[act_func], None if len(act_masks) == 1 else self._mask(nodes, valid))
+                                     for act_func, nodes in act_masks.items()])
+            self.aggregations.append([(AGGREGATIONS[agg_func], self._mask(nodes, valid))
+                                      for agg_func, nodes in agg_masks.items()])
+            self.linked.append(self._mask(links_at, weights) if agg_masks else None)
+
+
+# Boolean array shaped like `like` with the given index tuples set.
+    @staticmethod
+    def _mask(indices, like):
+
+        mask = np.zeros(like.shape, dtype=bool)
+        mask[tuple(np.array(indices).T)] = True
+        return mask
+
+
+# Evaluate the networks of the given lanes (all of them if lanes is None).
+# inputs has one row per lane; returns one row of outputs per lane.
+    def activate(self, inputs, lanes=None):
+
+        lanes = np.arange(self.size) if lanes is None else np.asarray(lanes)
+
+        inputs = np.asarray(inputs, dtype=float)
+        if self.networks is not None:
+            outputs = [self.networks[lane].activate(row) for lane, row in zip(lanes, inputs)]
+            return np.array(outputs, dtype=float).reshape(len(lanes), len(self.output_keys))
+
+        values = np.zeros((len(lanes), self.slot_count))
+        values[:, :len(self.input_keys)] = inputs
+
+        for level in range(self.depth_count):
+            # Only the networks deep enough to have nodes at this depth
+            rows = np.flatnonzero(self.has_level[level][lanes])
+            genomes = lanes[rows]
+
+            weights = self.weights[level][genomes]
+            totals = np.einsum("lks,ls->lk", weights, values[rows])
+            if self.aggregations[level]:
+                terms = weights * values[rows][:, None, :]
+                linked = self.linked[level][genomes]
+                for aggregate, mask in self.aggregations[level]:
+                    nodes = mask[genomes]
+                    totals = np.where(nodes, aggregate(terms, linked), totals)
+
+            pre_activation = self.biases[level][genomes] + self.responses[level][genomes] * totals
+            activated = np.zeros_like(pre_activation)
+            for activation, mask in self.activations[level]:
+                if mask is None:
+                    activated = activation(pre_activation)
+                else:
+                    activated = np.where(mask[genomes], activation(pre_activation), activated)
+
+            targets = self.targets[level][genomes]
+            current = values[rows[:, None], targets]
+            values[rows[:, None], targets] = np.where(self.valid[level][genomes], activated, current)
+
+        first_output = len(self.input_keys)
+        return values[:, first_output:first_output + len(self.output_keys)]
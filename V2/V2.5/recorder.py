@@ -0,0 +1,137 @@
+import threading
+import struct
+import queue
+import zlib
+import os
+import numpy as np
+import pygame
+
+
+
+
+# Grabador asíncrono de la ventana de entrenamiento.
+# Cada frame terminado se copia a uno de los búferes de un anillo reservado de antemano y un
+# hilo escritor lo guarda en disco, así el bucle de dibujo nunca espera a la escritura.
+# Si el escritor va atrasado y no queda ningún búfer libre el frame se descarta y se cuenta.
+# Los PNG se codifican aquí con zlib en lugar de pygame.image.save, que retiene el GIL
+# mientras comprime (~90 ms por frame a 1920x1010) y congelaría el bucle de dibujo.
+# Formatos:
+#   png  una imagen por frame, frame_000000.png, frame_000001.png, ...
+#   raw  todos los frames seguidos en RGB de 24 bits en frames_<ancho>x<alto>.rgb
+class FrameRecorder:
+
+
+    FORMATS = ("png", "raw")
+    PNG_COMPRESSION = 3
+
+
+#    Reserva el anillo de búferes y arranca el hilo escritor
+    def __init__(self, directory, size, fmt="png", every=1, buffers=8):
+
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Formato de grabación desconocido: {fmt}")
+
+        self.directory = directory
+        self.size = tuple(size)
+        self.fmt = fmt
+        self.every = max(every, 1)
+        os.makedirs(directory, exist_ok=True)
+
+        self.free = queue.Queue()
+        for _ in range(buffers):
+            self.free.put(pygame.Surface(self.size, depth=24))
+        self.pending = queue.Queue()
+
+        # Contadores: frames vistos, guardados y descartados
+        self.frames_seen = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.frames_queued = 0
+
+        self.raw_file = None
+        if fmt == "raw":
+            width, height = self.size
+            self.raw_file = open(os.path.join(directory, f"frames_{width}x{height}.rgb"), "wb")
+
+        self.writer = threading.Thread(target=self.write_frames, name="grabador", daemon=True)
+        self.writer.start()
+
+
+#    Copia el frame terminado a un búfer libre; nunca espera al disco
+    def capture(self, surface):
+
+        self.frames_seen += 1
+        if (self.frames_seen - 1) % self.every:
+            return
+
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            self.frames_dropped += 1
+            return
+
+        buffer.blit(surface, (0, 0))
+        self.pending.put((self.frames_queued, buffer))
+        self.frames_queued += 1
+
+
+#    Hilo escritor: guarda los búferes pendientes y los devuelve al anillo
+    def write_frames(self):
+
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+
+            index, buffer = item
+            if self.fmt == "png":
+                self.write_png(buffer, os.path.join(self.directory, f"frame_{index:06d}.png"))
+            else:
+                self.raw_file.write(self.rgb_rows(buffer))
+
+            self.frames_written += 1
+            self.free.put(buffer)
+
+
+#    Filas RGB del búfer; con filter_byte cada fila empieza con el byte de filtro de PNG
+    def rgb_rows(self, buffer, filter_byte=False):
+
+        width, height = self.size
+        rows = np.zeros((height, width * 3 + filter_byte), np.uint8)
+        pixels = pygame.surfarray.pixels3d(buffer)
+        rows[:, filter_byte:].reshape(height, width, 3)[:] = pixels.transpose(1, 0, 2)
+        del pixels  # desbloquea el búfer
+        return rows
+
+
+#    Guarda el búfer como PNG RGB de 8 bits; zlib libera el GIL mientras comprime
+    def write_png(self, buffer, path):
+
+        width, height = self.size
+        data = zlib.compress(self.rgb_rows(buffer, filter_byte=True), self.PNG_COMPRESSION)
+
+        with open(path, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+            for kind, body in ((b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+                               (b"IDAT", data),
+                               (b"IEND", b"")):
+                f.write(struct.pack(">I", len(body)) + kind + body)
+                f.write(struct.pack(">I", zlib.crc32(kind + body)))
+
+
+#    Texto corto con el estado de la grabación, para el dashboard
+    def label(self):
+
+        return f"{self.frames_written} guardados, {self.frames_dropped} descartados"
+
+
+#    Termina de escribir los frames pendientes, cierra los ficheros y muestra el resumen
+    def close(self):
+
+        self.pending.put(None)
+        self.writer.join()
+        if self.raw_file is not None:
+            self.raw_file.close()
+
+        print(f"Grabación en '{self.directory}': {self.frames_written} frames guardados, "
+              f"{self.frames_dropped} descartados (1 de cada {self.every})")
@@ -0,0 +1,208 @@
+import time
+
+
+
+
+# Frecuencia de refresco del dashboard, independiente de la velocidad de simulación
+DISPLAY_HZ = 60
+
+
+
+
+# Planificador de paso fijo: decide cuándo toca avanzar la simulación y cuándo dibujar.
+# Con sim_hz=None la simulación avanza tan rápido como puede y solo se dibuja una
+# instantánea display_hz veces por segundo.
+class FrameScheduler:
+
+
+#    Inicializa el planificador
+    def __init__(self, sim_hz=None, display_hz=DISPLAY_HZ):
+
+        self.sim_hz = sim_hz
+        self.display_hz = display_hz
+
+        now = time.perf_counter()
+        self.next_step = now
+        self.next_render = now
+
+
+#    Devuelve True si toca avanzar un paso de simulación
+    def step_due(self):
+
+        if self.sim_hz is None:
+            return True
+
+        now = time.perf_counter()
+        if now < self.next_step:
+            return False
+
+        # Si vamos atrasados no se acumulan pasos pendientes
+        self.next_step = max(self.next_step + 1 / self.sim_hz, now - 1 / self.sim_hz)
+        return True
+
+
+#    Devuelve True si toca dibujar una instantánea
+    def render_due(self):
+
+        now = time.perf_counter()
+        if now < self.next_render:
+            return False
+
+        self.next_render = max(self.next_render + 1 / self.display_hz, now)
+        return True
+
+
+#    Duerme hasta el próximo paso o dibujo (solo si la simulación tiene ritmo fijo)
+    def wait(self):
+
+        if self.sim_hz is None:
+            return
+
+        delay = min(self.next_step, self.next_render) - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+
+
+# Control de velocidad del entrenamiento, cambiable en caliente desde el teclado.
+# Modos:
+#   REALTIME         1x: 100 pasos por segundo, como el antiguo clock.tick(100)
+#   STEPS_PER_FRAME  N pasos de simulación por cada frame dibujado
+#   EVERY_KTH        simulación sin límite, se dibuja uno de cada K pasos
+#   MAX              simulación sin límite, se dibuja a DISPLAY_HZ
+#   TURBO            simulación sin límite, solo se refresca el panel de estadísticas
+class SpeedControl:
+
+
+    REALTIME = "1x"
+    STEPS_PER_FRAME = "pasos/frame"
+    EVERY_KTH = "1 de cada K"
+    MAX = "máx"
+    TURBO = "turbo"
+
+    REALTIME_HZ = 100
+    TURBO_DISPLAY_HZ = 4
+    MAX_FACTOR = 1024
+
+
+#    Inicializa el control en el modo indicado
+    def __init__(self, mode=MAX):
+
+        self.steps_per_frame = 4
+        self.render_every = 10
+        self.mode = mode
+        self.previous_mode = self.MAX
+        self.set_mode(mode)
+
+        # Medida de pasos por segundo
+        self.total_steps = 0
+        self.rate_steps = 0
+        self.rate_start = time.perf_counter()
+        self.steps_per_second = 0.0
+
+
+#    Cambia de modo y reinicia el planificador
+    def set_mode(self, mode):
+
+        if mode == self.TURBO and self.mode != self.TURBO:
+            self.previous_mode = self.mode
+        self.mode = mode
+
+        if mode == self.REALTIME:
+            self.scheduler = FrameScheduler(sim_hz=self.REALTIME_HZ)
+        elif mode == self.TURBO:
+            self.scheduler = FrameScheduler(display_hz=self.TURBO_DISPLAY_HZ)
+        else:
+            self.scheduler = FrameScheduler()
+        self.steps_since_render = 0
+
+
+#    Activa o desactiva el modo turbo, volviendo al modo anterior
+    def toggle_turbo(self):
+
+        self.set_mode(self.previous_mode if self.mode == self.TURBO else self.TURBO)
+
+
+#    Duplica N o K según el modo actual
+    def faster(self):
+
+        if self.mode == self.STEPS_PER_FRAME:
+            self.steps_per_frame = min(self.steps_per_frame * 2, self.MAX_FACTOR)
+        elif self.mode == self.EVERY_KTH:
+            self.render_every = min(self.render_every * 2, self.MAX_FACTOR)
+
+
+#    Divide entre dos N o K según el modo actual
+    def slower(self):
+
+        if self.mode == self.STEPS_PER_FRAME:
+            self.steps_per_frame = max(self.steps_per_frame // 2, 1)
+        elif self.mode == self.EVERY_KTH:
+            self.render_every = max(self.render_every // 2, 1)
+
+
+#    Devuelve True si toca avanzar un paso de simulación
+    def step_due(self):
+
+        if self.mode == self.STEPS_PER_FRAME:
+            return self.steps_since_render < self.steps_per_frame
+
+        return self.scheduler.step_due()
+
+
+#    Registra un paso de simulación
+    def count_step(self):
+
+        self.steps_since_render += 1
+        self.total_steps += 1
+        self.rate_steps += 1
+
+        now = time.perf_counter()
+        elapsed = now - self.rate_start
+        if elapsed >= 0.5:
+            self.steps_per_second = self.rate_steps / elapsed
+            self.rate_steps = 0
+            self.rate_start = now
+
+
+#    Devuelve True si toca dibujar
+    def render_due(self):
+
+        if self.mode == self.EVERY_KTH:
+            # Sin pasos pendientes (p. ej. todos muertos) se sigue dibujando a DISPLAY_HZ
+            due = self.steps_since_render >= self.render_every or (
+                self.steps_since_render == 0 and self.scheduler.render_due())
+        else:
+            due = self.scheduler.render_due()
+
+        if due:
+            self.steps_since_render = 0
+        return due
+
+
+#    Indica si se dibujan los juegos o solo el panel de estadísticas
+    def render_games(self):
+
+        return self.mode != self.TURBO
+
+
+#    Duerme cuando no queda nada que hacer hasta el próximo paso o dibujo
+    def wait(self):
+
+        if self.mode == self.STEPS_PER_FRAME and self.steps_since_render >= self.steps_per_frame:
+            delay = self.scheduler.next_render - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            self.scheduler.wait()
+
+
+#    Texto corto con el modo actual, para el dashboard
+    def label(self):
+
+        if self.mode == self.STEPS_PER_FRAME:
+            return f"{self.steps_per_frame} pasos/frame"
+        if self.mode == self.EVERY_KTH:
+            return f"1 de cada {self.render_every}"
+        return self.mode